@@ -3,8 +3,10 @@ import re
 import json
 from dotenv import load_dotenv
 import google.generativeai as genai
+from google.api_core.exceptions import DeadlineExceeded
 # from tabulate import tabulate
 from questionnaire import QUESTIONNAIRE, ask_questionnaire
+from singleflight import SingleFlight
 
 dotenv_path = os.path.join(os.path.dirname(__file__), "keys.env")
 load_dotenv(dotenv_path)
@@ -28,6 +30,13 @@ if not API_KEY_SECOND:
 # details_model_name = "gemini-2.5-flash"
 details_model_name = "gemini-flash-latest"
 
+# Identical prompts that are in flight at the same time share one Gemini call.
+# The call itself is bounded by LLM_CALL_TIMEOUT, so a hung request always
+# releases its key; followers wait a little longer to receive its outcome.
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", 90))
+LLM_FOLLOWER_TIMEOUT = LLM_CALL_TIMEOUT + 5
+llm_calls = SingleFlight()
+
 
 # ------------------ PROMPTS ------------------
 PROMPT = """You are a Laptop Recommendation Expert.
@@ -128,10 +137,115 @@ def answers_to_query(answers: dict) -> str:
             query_parts.append(f"{k}: {v}")
     return " ; ".join(query_parts)
 
+def canonical_query(answers: dict) -> str:
+    """
+    Same shape as answers_to_query, but with keys sorted and multi-choice
+    answers ordered, so equivalent questionnaires map to the same string.
+    """
+    canonical = {}
+    for k in sorted(answers.keys()):
+        v = answers[k]
+        if isinstance(v, list):
+            canonical[k] = sorted(str(x).strip() for x in v)
+        else:
+            canonical[k] = str(v).strip()
+    return answers_to_query(canonical)
+
+def _generate_text(gen_model, prompt: str) -> str:
+    try:
+        resp = gen_model.generate_content(prompt, request_options={"timeout": LLM_CALL_TIMEOUT})
+    except DeadlineExceeded as e:
+        raise TimeoutError(f"Gemini call timed out after {LLM_CALL_TIMEOUT}s") from e
+    return resp.text or ""
+
+class IncrementalJSONParser:
+    """
+    Consumes a JSON document chunk by chunk and yields every object that
+    is an element of an array (e.g. each entry of "items") as soon as its
+    closing brace arrives. Text before the first '{' (fences, prose) is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.stack = []          # open containers: '{' or '['
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.item_start = None   # buffer offset of the current array element object
+        self.item_depth = None   # stack depth at which that object was opened
+
+    def feed(self, chunk: str):
+        self.buffer += chunk
+        completed = []
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                else:
+                    self.pos += 1
+                    continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                if ch == "{" and self.stack and self.stack[-1] == "[" and self.item_start is None:
+                    self.item_start = self.pos
+                    self.item_depth = len(self.stack)
+                self.stack.append(ch)
+            elif ch in "}]":
+                if self.stack:
+                    self.stack.pop()
+                if ch == "}" and self.item_start is not None and len(self.stack) == self.item_depth:
+                    try:
+                        completed.append(json.loads(self.buffer[self.item_start:self.pos + 1]))
+                    except ValueError:
+                        pass
+                    self.item_start = None
+                    self.item_depth = None
+            self.pos += 1
+        return completed
+
+def run_query_stream(q: str):
+    """
+    Streaming variant of run_query.
+    Yields ("item", dict) for each recommendation as soon as it is complete,
+    then ("done", data) with the fully parsed response (or an error dict).
+    """
+    parser = IncrementalJSONParser()
+    raw_parts = []
+
+    for chunk in model.generate_content(build_prompt(q), stream=True):
+        try:
+            text = chunk.text or ""
+        except ValueError:
+            # Chunks without text parts (e.g. safety metadata) raise on .text
+            continue
+        raw_parts.append(text)
+        for obj in parser.feed(text):
+            if isinstance(obj, dict) and obj.get("model"):
+                yield "item", obj
+
+    raw = "".join(raw_parts)
+    try:
+        data = json.loads(extract_json(raw).strip())
+    except Exception:
+        data = {"error": "Failed to parse model output", "raw": raw}
+    yield "done", data
+
 # ------------------ MAIN BOT ------------------
 def run_query(q: str, return_json=False):
-    resp = model.generate_content(build_prompt(q))
-    raw = resp.text or ""
+    prompt = build_prompt(q)
+    raw = llm_calls.do(("recommend", prompt), _generate_text, model, prompt, timeout=LLM_FOLLOWER_TIMEOUT)
     js = extract_json(raw).strip()
 
     try:
@@ -166,11 +280,13 @@ def fetch_laptop_details(items, q: str="", return_json=False):
         f"Models:\n" + "\n".join(models) + "\n\nJSON:"
     )
     
-    genai.configure(api_key=API_KEY_SECOND)
-    details_model = genai.GenerativeModel(details_model_name)
+    def generate_details():
+        genai.configure(api_key=API_KEY_SECOND)
+        details_model = genai.GenerativeModel(details_model_name)
+        return _generate_text(details_model, query)
 
-    resp = details_model.generate_content(query)
-    raw = resp.text or ""
+    flight_key = ("details", q, tuple(sorted(models)))
+    raw = llm_calls.do(flight_key, generate_details, timeout=LLM_FOLLOWER_TIMEOUT)
     js = extract_json(raw).strip()
     try:
         details_data = json.loads(js)
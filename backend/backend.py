@@ -1,15 +1,26 @@
-from flask import Flask, request, jsonify, send_from_directory, Response
+from flask import Flask, request, jsonify, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 from datetime import datetime, timedelta
 import jwt
 import os
-from Laptop_Bot import run_query, answers_to_query, QUESTIONNAIRE, ask_questionnaire, fetch_laptop_details
+import json
+import hashlib
+import time
+from Laptop_Bot import run_query, run_query_stream, answers_to_query, canonical_query, QUESTIONNAIRE, ask_questionnaire, fetch_laptop_details
+from query_cache import QueryResultCache, make_cache_key
 from functools import wraps 
-from flask import send_file, abort
-from reviews.analysis import process_models
-import threading
-PROCESSING_TASKS = set()
-import threading # Ensure threading is imported if the plan is to use it
+from flask import abort
+from reviews.analysis import (
+    process_model, ANALYSIS_ENGINE, start_analysis_pool, embedding_metrics,
+    COMPLETENESS_ORDER, is_complete, is_fresh, failed_recently, refresh_failed_recently,
+    unified_cache_key
+)
+from reviews.cache_store import get_cache_store, valid_key, NS_UNIFIED
+from reviews.model_names import canonical_model_name, model_cache_key
+from jobs import (
+    analysis_jobs, get_job, all_metrics, QueueFull,
+    PRIORITY_INTERACTIVE, PRIORITY_PREFETCH, JOB_FAILED
+)
 
 # ----------------------------------------------------------------------
 # NEW: JWT Configuration
@@ -29,9 +40,24 @@ from db_mongo import (
     verify_password,
     update_user_wishlist,
     get_wishlisted_laptops,
-    store_laptop_recommendations # Also ensure this is available for the non-threaded /query
+    store_laptop_recommendations, # Also ensure this is available for the non-threaded /query
+    query_cache_collection,
+    ensure_indexes,
+    check_query_plans,
+    get_laptop_by_model,
+    resolve_projection
 )
 
+# Idempotent; runs on every worker start (dev server or gunicorn)
+ensure_indexes()
+check_query_plans()
+
+if ANALYSIS_ENGINE == "process":
+    start_analysis_pool()
+
+# Result cache in front of run_query (in-process LRU + Mongo tier)
+query_cache = QueryResultCache(collection=query_cache_collection)
+
 # --- Configuration ---
 app = Flask(__name__, static_folder='static')
 CORS(app, resources={r"/*": {"origins": "*", "allow_headers": ["Content-Type", "Authorization"]}})
@@ -117,46 +143,50 @@ def wishlist_options_handler_model(model):
 @auth_required
 def get_user_wishlist():
     user_id = request.user_id 
+
+    projection = resolve_projection(request.args.get("fields"))
+    if projection is None:
+        return jsonify({"message": "Unknown field in 'fields' parameter"}), 400
     
-    wishlist_laptops = get_wishlisted_laptops(user_id)
+    wishlist_laptops = get_wishlisted_laptops(user_id, projection=projection)
     
     return jsonify(wishlist_laptops), 200
 
 # --- Search Endpoint ---
 
-@app.route("/query", methods=["POST"])
-def query():
-    data = request.json
-    user_ip = request.remote_addr
-    
+def parse_query_payload(data):
+    """Returns (query_str, keyword, cache_key) for a /query payload, or None."""
     if "answers" in data:
         query_str = answers_to_query(data["answers"])
-        keyword = query_str
+        return query_str, query_str, make_cache_key(canonical_query(data["answers"]))
     elif "custom_query" in data:
         query_str = data["custom_query"]
-        keyword = query_str
-    else:
-        return jsonify({"error": "No query provided"}), 400
+        return query_str, query_str, make_cache_key(query_str.lower())
+    return None
 
-    request_id = store_initial_request(user_ip, keyword)
-    resp_json = run_query(query_str, return_json=True)
+def get_optional_user_id():
+    """Extracts user_id from the Authorization header if present (None for anonymous users)."""
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        try:
+            token = auth_header.split(" ")[1]
+            token_data = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+            return token_data.get("user_id")
+        except Exception as e:
+            print(f"Error decoding JWT in /query: {e}")
+    return None
+
+def submit_analysis(model_name, priority):
+    """Queues review analysis for a model, deduplicated on its canonical cache key."""
+    model_name = canonical_model_name(model_name)
+    return analysis_jobs.submit(model_cache_key(model_name), process_model, model_name, priority=priority)
+
+def handle_query_result(request_id, resp_json, query_str, user_id):
+    """Persists a bot response and kicks off review analysis for the recommended models."""
     store_bot_response(request_id, str(resp_json))
 
     # Store each laptop as a separate document
     if "items" in resp_json:
-        # 1. Extract user_id from the Authorization header if present
-        user_id = None 
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-             try:
-                 token = auth_header.split(" ")[1]
-                 token_data = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-                 user_id = token_data.get("user_id")
-             except Exception as e:
-                 print(f"Error decoding JWT in /query: {e}")
-                 pass
-
-        # 2. Pass the extracted user_id to the store function
         store_laptop_recommendations(
             request_id, 
             resp_json["items"], 
@@ -166,13 +196,116 @@ def query():
         model_names = [item.get("model") for item in resp_json["items"] if "model" in item]
 
         print("🖥️ Model names:", model_names)
-        
-        # process_models(model_names)
-        threading.Thread(target=process_models, args=(model_names,), daemon=True).start()
 
-        
+        # Prefetch review analysis; interactive requests jump ahead of these
+        for name in model_names:
+            try:
+                submit_analysis(name, priority=PRIORITY_PREFETCH)
+            except QueueFull as e:
+                print(f"⚠️ Skipping analysis prefetch for {name}: {e}")
+
+@app.route("/query", methods=["POST"])
+def query():
+    data = request.json
+    user_ip = request.remote_addr
+    
+    parsed = parse_query_payload(data)
+    if not parsed:
+        return jsonify({"error": "No query provided"}), 400
+    query_str, keyword, cache_key = parsed
+
+    request_id = store_initial_request(user_ip, keyword)
+
+    resp_json = query_cache.get(cache_key)
+    if resp_json is not None:
+        print(f"♻️ Query cache hit: {cache_key[:12]}")
+    else:
+        try:
+            resp_json = run_query(query_str, return_json=True)
+        except TimeoutError as e:
+            # Our Gemini call, or the identical in-flight one we joined, timed out
+            print(f"⚠️ Query timed out: {e}")
+            response = jsonify({"error": "The recommendation service is taking too long. Please retry shortly."})
+            response.headers["Retry-After"] = "10"
+            return response, 504
+        # Only successful parses are cached; errors should be retried
+        if "items" in resp_json:
+            query_cache.set(cache_key, resp_json)
+
+    handle_query_result(request_id, resp_json, query_str, get_optional_user_id())
     return jsonify(resp_json)
 
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@app.route("/query/stream", methods=["POST"])
+def query_stream():
+    """
+    Same contract as /query, but answers with Server-Sent Events:
+    one "item" event per laptop as soon as Gemini has produced it,
+    then a "done" event carrying the full response.
+    """
+    data = request.json
+    user_ip = request.remote_addr
+
+    parsed = parse_query_payload(data)
+    if not parsed:
+        return jsonify({"error": "No query provided"}), 400
+    query_str, keyword, cache_key = parsed
+
+    # Resolve everything that needs the request context before streaming starts
+    user_id = get_optional_user_id()
+    request_id = store_initial_request(user_ip, keyword)
+
+    def generate():
+        resp_json = query_cache.get(cache_key)
+        if resp_json is not None:
+            print(f"♻️ Query cache hit: {cache_key[:12]}")
+            for item in resp_json.get("items", []):
+                yield sse_event("item", item)
+        else:
+            resp_json = {"error": "No response from model"}
+            try:
+                for kind, payload in run_query_stream(query_str):
+                    if kind == "item":
+                        yield sse_event("item", payload)
+                    else:
+                        resp_json = payload
+            except Exception as e:
+                print(f"❌ Streaming query failed: {e}")
+                resp_json = {"error": str(e)}
+
+            if "items" in resp_json:
+                query_cache.set(cache_key, resp_json)
+
+        # Store before "done" so a follow-up GET /laptops already sees the new cards
+        handle_query_result(request_id, resp_json, query_str, user_id)
+        yield sse_event("done", resp_json)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
+@app.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    return jsonify(query_cache.stats()), 200
+
+# --- Background Jobs ---
+
+@app.route("/jobs/metrics", methods=["GET"])
+def get_job_metrics():
+    return jsonify(all_metrics()), 200
+
+@app.route("/inference/metrics", methods=["GET"])
+def get_inference_metrics():
+    return jsonify(embedding_metrics()), 200
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job_status(job_id):
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"message": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
 # --- Laptop Retrieval Endpoint ---
 
 @app.route("/laptops", methods=["GET"])
@@ -189,9 +322,14 @@ def get_laptops():
             # Token is expired/invalid, treat as anonymous
             pass
 
+    # ?fields=summary (default) | full | comma-separated field names
+    projection = resolve_projection(request.args.get("fields"))
+    if projection is None:
+        return jsonify({"message": "Unknown field in 'fields' parameter"}), 400
+
     if user_id:
         # 2. Authenticated user: use the personalized, merged function
-        laptops = get_merged_recommendations_for_user(user_id)
+        laptops = get_merged_recommendations_for_user(user_id, projection=projection)
     else:
         # 3. Anonymous user: return an empty list (as the old global function is gone)
         laptops = []
@@ -203,6 +341,19 @@ def get_laptops():
     # so no need for the loop here.
     return jsonify(laptops), 200
 
+@app.route("/laptops/<path:model>", methods=["GET"])
+def get_laptop_details(model):
+    laptop = get_laptop_by_model(model)
+    if not laptop:
+        return jsonify({"message": f"Laptop {model} not found"}), 404
+
+    body = json.dumps(laptop, sort_keys=True, ensure_ascii=False, default=str)
+    response = Response(body, mimetype="application/json")
+    response.set_etag(hashlib.sha1(body.encode("utf-8")).hexdigest())
+    # Clients may keep a copy but must revalidate (cheap 304 while details are unchanged)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
 # --- Auth Endpoints ---
 
 @app.route("/signup", methods=["POST"])
@@ -244,51 +395,144 @@ def login():
     else:
         return jsonify({"message": "Invalid username or password"}), 401 
     
-@app.route('/api/reviews/analysis/<modelname>', methods=['GET'])
-def get_review_analysis(modelname):
-    # 1. Setup Paths
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "reviews", "json_files", "unified_analysis"))
-    safe_modelname = modelname.replace(" ", "_")
-    filename = f"{safe_modelname}_unified.json"
-    file_path = os.path.join(base_dir, filename)
-
-    # 2. Security Check
-    if not os.path.commonpath([base_dir, os.path.abspath(file_path)]) == base_dir:
-        return abort(403, description="Access forbidden: Invalid file path.")
-
-    # 3. Check if file exists
-    if os.path.isfile(file_path):
-        print(f"✅ Serving analysis for: {modelname}")
-        return send_file(file_path, mimetype='application/json')
-
-    # 4. FILE NOT FOUND - TRIGGER ON-DEMAND PROCESSING
-    print(f"⚠️ Analysis not found for: {modelname}")
-
-    if modelname in PROCESSING_TASKS:
-        print(f"⏳ Analysis is already running for {modelname}. Client should retry...")
+LONG_POLL_MAX_SEC = 30
+
+def analysis_cache_key(modelname):
+    """
+    Cache-store key of a model's unified analysis (any spelling of the model
+    resolves to the same key), or None if the name isn't a safe key.
+    """
+    key = unified_cache_key(modelname)
+    return key if valid_key(key) else None
+
+def analysis_accepted(modelname, job):
+    """202 response telling the client where to wait for a running analysis."""
+    eta = analysis_jobs.eta(job)
+    response = jsonify({
+        "status": job.status,
+        "job_id": job.id,
+        "eta_sec": eta,
+        "wait_url": f"/api/reviews/analysis/{modelname}/wait"
+    })
+    response.headers["Location"] = f"/jobs/{job.id}"
+    response.headers["Retry-After"] = str(max(int(eta), 1))
+    return response, 202
+
+def queue_full_response():
+    response = jsonify({"message": "Analysis queue is full. Please retry shortly."})
+    response.headers["Retry-After"] = "10"
+    return response, 503
+
+def read_analysis(key):
+    """Parsed analysis entry, or None if it isn't there (tiers are replaced atomically)."""
+    return get_cache_store().get(NS_UNIFIED, key)
+
+def analysis_tier(data):
+    return COMPLETENESS_ORDER.index(data.get("completeness", COMPLETENESS_ORDER[-1]))
+
+def partial_analysis_response(modelname, data, job):
+    """A finished tier, served while the remaining ones are still being computed."""
+    response = jsonify(data)
+    if job is not None:
+        response.headers["Location"] = f"/jobs/{job.id}"
+    response.headers["Link"] = f'</api/reviews/analysis/{modelname}/wait?after={data["completeness"]}>; rel="next"'
+    return response, 200
+
+def failed_analysis_response(modelname, data):
+    """The tiers that finished before one failed, served as final until the retry time."""
+    print(f"⚠️ Serving partial analysis for {modelname}: {data['failure']['tier']} tier failed")
+    response = jsonify(data)
+    response.headers["Retry-After"] = str(max(int(data["failure"]["retry_at"] - time.time()), 1))
+    return response, 200
+
+def serve_complete_analysis(modelname, data):
+    """Serves a complete analysis right away; a stale one is also refreshed in the background."""
+    fresh = is_fresh(data)
+    if not fresh and refresh_failed_recently(data):
+        print(f"⚠️ Serving stale analysis for {modelname}; last refresh failed, not retrying yet")
+    elif not fresh:
+        try:
+            job = submit_analysis(modelname, priority=PRIORITY_PREFETCH)
+            print(f"🔄 Serving stale analysis for {modelname}; refresh job {job.id} is {job.status}")
+        except QueueFull:
+            print(f"⚠️ Serving stale analysis for {modelname}; refresh skipped (queue full)")
     else:
-        print(f"🚀 Triggering background analysis for {modelname}...")
-        
-        # Add to tracking set
-        PROCESSING_TASKS.add(modelname)
-
-        # Define a wrapper to run analysis and clean up the set afterwards
-        def run_and_cleanup(name):
-            try:
-                # Run the actual heavy lifting
-                process_models([name]) 
-            except Exception as e:
-                print(f"❌ Error during on-demand analysis for {name}: {e}")
-            finally:
-                # Remove from tracking set so it can be retried if needed later
-                if name in PROCESSING_TASKS:
-                    PROCESSING_TASKS.remove(name)
-
-        # Start the thread
-        threading.Thread(target=run_and_cleanup, args=(modelname,), daemon=True).start()
+        print(f"✅ Serving analysis for: {modelname}")
+    response = jsonify(data)
+    response.headers["X-Analysis-Cache"] = "fresh" if fresh else "stale"
+    return response
 
-    # Return 404 so your React Frontend "catch" block triggers the retry/polling logic
-    return abort(404, description="Analysis processing started. Please retry shortly.")
+@app.route('/api/reviews/analysis/<modelname>', methods=['GET'])
+def get_review_analysis(modelname):
+    key = analysis_cache_key(modelname)
+    if not key:
+        return abort(403, description="Access forbidden: Invalid model name.")
+
+    data = read_analysis(key)
+    if data is not None and is_complete(data):
+        return serve_complete_analysis(modelname, data)
+    if data is not None and failed_recently(data):
+        return failed_analysis_response(modelname, data)
+
+    # Not ready yet - queue on-demand processing (deduplicated) and hand back the job
+    # (or the tier that is already done, so charts can render early)
+    print(f"⚠️ Full analysis not found for: {modelname}")
+    try:
+        job = submit_analysis(modelname, priority=PRIORITY_INTERACTIVE)
+        print(f"🚀 Analysis job {job.id} for {modelname} is {job.status}")
+    except QueueFull:
+        if data is not None:
+            return partial_analysis_response(modelname, data, None)
+        return queue_full_response()
+
+    if data is not None:
+        return partial_analysis_response(modelname, data, job)
+    return analysis_accepted(modelname, job)
+
+@app.route('/api/reviews/analysis/<modelname>/wait', methods=['GET'])
+def wait_for_review_analysis(modelname):
+    """
+    Long-poll: holds the request until the model's analysis has a tier newer
+    than ?after= (or any tier, if omitted), for at most ?timeout= seconds
+    (capped at LONG_POLL_MAX_SEC), then serves it, or answers 202 again so
+    the client re-issues the wait.
+    """
+    key = analysis_cache_key(modelname)
+    if not key:
+        return abort(403, description="Access forbidden: Invalid model name.")
+
+    after = request.args.get("after")
+    seen_tier = COMPLETENESS_ORDER.index(after) if after in COMPLETENESS_ORDER else -1
+
+    data = read_analysis(key)
+    if data is not None and failed_recently(data):
+        return failed_analysis_response(modelname, data)
+    if data is None or not is_complete(data):
+        try:
+            job = submit_analysis(modelname, priority=PRIORITY_INTERACTIVE)
+        except QueueFull:
+            return queue_full_response()
+
+        timeout = min(request.args.get("timeout", LONG_POLL_MAX_SEC, type=float), LONG_POLL_MAX_SEC)
+        deadline = time.time() + timeout
+        # Tiers may be written by a worker process, so watch the stored entry itself
+        while (data is None or analysis_tier(data) <= seen_tier) and time.time() < deadline:
+            if job.done.wait(min(0.25, max(deadline - time.time(), 0))):
+                data = read_analysis(key)
+                break
+            data = read_analysis(key)
+
+        if data is not None and failed_recently(data):
+            return failed_analysis_response(modelname, data)
+        if data is None or analysis_tier(data) <= seen_tier:
+            if job.status == JOB_FAILED:
+                return jsonify({"message": f"Analysis failed: {job.error}", "job_id": job.id}), 500
+            return analysis_accepted(modelname, job)
+
+        if not is_complete(data):
+            return partial_analysis_response(modelname, data, job)
+
+    return serve_complete_analysis(modelname, data)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
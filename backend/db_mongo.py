@@ -1,10 +1,13 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from pymongo.errors import OperationFailure
 from bson.objectid import ObjectId
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import os
 from dotenv import load_dotenv
 import numpy as np
 from passlib.context import CryptContext
+from jobs import JobQueue, QueueFull
+from reviews.model_names import canonical_model_name
 # from Laptop_Bot import fetch_laptop_details
 
 load_dotenv()
@@ -21,6 +24,79 @@ db = client[DB_NAME]
 requests_collection = db["requests"]
 laptops_collection = db["laptops"]
 users_collection = db["users"]
+query_cache_collection = db["query_cache"]
+
+# --- Indexes ---
+REQUESTS_TTL_DAYS = int(os.getenv("REQUESTS_TTL_DAYS", 30))
+
+# (collection, keys, options). Names are fixed so re-runs are no-ops.
+INDEX_SPECS = [
+    (laptops_collection, [("model", ASCENDING)], {"name": "model_unique", "unique": True}),
+    (users_collection, [("username", ASCENDING)], {"name": "username_unique", "unique": True}),
+    (requests_collection, [("timestamp", ASCENDING)],
+        {"name": "timestamp_ttl", "expireAfterSeconds": REQUESTS_TTL_DAYS * 24 * 60 * 60}),
+    (query_cache_collection, [("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+]
+
+# Indexes earlier versions created that no query needs any more.
+# id_wishlist_model: _id is unique, so the wishlist toggle is served by the _id index alone.
+RETIRED_INDEXES = [
+    (users_collection, "id_wishlist_model"),
+]
+
+def ensure_indexes():
+    """Creates every index the queries in this module rely on. Safe to call on every startup."""
+    for collection, keys, options in INDEX_SPECS:
+        try:
+            collection.create_index(keys, **options)
+        except OperationFailure as e:
+            if "expireAfterSeconds" in options and e.code in (85, 86):
+                # Same index, different TTL: update it in place instead of failing
+                db.command("collMod", collection.name, index={
+                    "keyPattern": dict(keys), "expireAfterSeconds": options["expireAfterSeconds"]
+                })
+                print(f"🔁 Updated TTL on {collection.name}.{options['name']}")
+            elif e.code == 11000:
+                print(f"⚠️ Cannot create {collection.name}.{options['name']}: duplicate values already stored ({e})")
+            else:
+                print(f"⚠️ Failed to create index {collection.name}.{options['name']}: {e}")
+        except Exception as e:
+            print(f"⚠️ Failed to create index {collection.name}.{options['name']}: {e}")
+    for collection, name in RETIRED_INDEXES:
+        try:
+            if name in collection.index_information():
+                collection.drop_index(name)
+                print(f"🗑️ Dropped unused index {collection.name}.{name}")
+        except Exception as e:
+            print(f"⚠️ Failed to drop index {collection.name}.{name}: {e}")
+    print("✅ MongoDB indexes verified.")
+
+def _plan_stages(plan):
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+def check_query_plans():
+    """Warns at startup if any hot query would fall back to a collection scan."""
+    probe_id = ObjectId()
+    hot_queries = {
+        "laptops by model": (laptops_collection, {"model": {"$in": ["probe"]}}),
+        "user by username": (users_collection, {"username": "probe"}),
+        "wishlist toggle": (users_collection, {"_id": probe_id, "wishlist.model": {"$ne": "probe"}}),
+        "request by id": (requests_collection, {"_id": probe_id}),
+    }
+    for label, (collection, query) in hot_queries.items():
+        try:
+            plan = collection.find(query).explain()["queryPlanner"]["winningPlan"]
+            stages = _plan_stages(plan)
+            if "COLLSCAN" in stages:
+                print(f"⚠️ Query '{label}' on {collection.name} does a collection scan: {stages}")
+        except Exception as e:
+            print(f"⚠️ Could not explain query '{label}': {e}")
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto") 
 
@@ -67,16 +143,114 @@ def store_bot_response(request_id_str, bot_result):
         {"$set": {"bot_result": bot_result, "status": "processed"}}
     )
 
-# MODIFIED: Added user_id to the function signature
-def store_laptop_recommendations(request_id, items, query_str, user_id=None):
+# --- Background detail fetching ---
+# fetch_laptop_details is a second, slow Gemini call. It runs on a job
+# queue worker so /query can respond as soon as the recommendations are stored.
+DETAILS_PENDING = "pending"
+DETAILS_READY = "ready"
+DETAILS_FAILED = "failed"
+
+# A queued/running fetch "claims" its models; a claim older than this is assumed lost
+DETAILS_CLAIM_TIMEOUT_SEC = float(os.getenv("DETAILS_CLAIM_TIMEOUT_SEC", 600))
+# Failed fetches are retried after BASE, doubling per failure up to MAX
+DETAILS_RETRY_BASE_SEC = float(os.getenv("DETAILS_RETRY_BASE_SEC", 300))
+DETAILS_RETRY_MAX_SEC = float(os.getenv("DETAILS_RETRY_MAX_SEC", 86400))
+
+def _utcnow():
+    # Naive UTC: what pymongo hands back for stored datetimes
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def needs_detail_fetch(existing, now):
+    """True if nobody is fetching this model's details and they aren't ready (or a retry is due)."""
+    if not existing:
+        return True
+    status = existing.get("details_status")
+    if status == DETAILS_PENDING:
+        requested_at = existing.get("details_requested_at")
+        return requested_at is None or now - requested_at > timedelta(seconds=DETAILS_CLAIM_TIMEOUT_SEC)
+    if status == DETAILS_FAILED:
+        retry_at = existing.get("details_retry_at")
+        return retry_at is None or now >= retry_at
+    return False
+
+# One worker: these calls share a Gemini quota, parallelism buys little
+details_jobs = JobQueue("details", workers=1, max_queue=int(os.getenv("DETAILS_QUEUE_SIZE", 100)))
+
+def enqueue_detail_fetch(models):
+    try:
+        job = details_jobs.submit(tuple(sorted(models)), fetch_and_store_details, list(models))
+        print(f"🧵 Queued detail fetch for {len(models)} models (job {job.id})")
+    except QueueFull as e:
+        # Models stay "pending" and are re-queued once their claim times out
+        print(f"⚠️ Skipping detail fetch for {models}: {e}")
+
+def fetch_and_store_details(models):
+    """Fetches detailed specs for the given models and upserts them into laptops_collection."""
     from Laptop_Bot import fetch_laptop_details  # local import avoids circular dependency
 
-    
+    print(f"\nFetching details for {len(models)} new models...")
+    fetched_details = []
+    try:
+        fetched_details = fetch_laptop_details([{"model": m} for m in models], return_json=True)
+        if not isinstance(fetched_details, list):
+            print("⚠️ fetch_laptop_details did not return a list — wrapping result manually.")
+            fetched_details = [fetched_details]
+    except Exception as e:
+        print(f"Error fetching laptop details: {e}")
 
-    new_models = []
-    item_map = {}
+    # Build a mapping from model → detailed specs
+    fetched_map = {}
+    for detail in fetched_details or []:
+        if isinstance(detail, dict) and detail.get("model"):
+            fetched_map[canonical_model_name(detail["model"])] = detail
+
+    failed = [m for m in models if not fetched_map.get(m)]
+    attempts = {}
+    if failed:
+        attempts = {
+            d["model"]: d.get("details_attempts", 0)
+            for d in laptops_collection.find({"model": {"$in": failed}}, {"model": 1, "details_attempts": 1})
+        }
 
-    # Step 1: Identify models that are not in DB
+    operations = []
+    for model in models:
+        extra = fetched_map.get(model)
+        if extra:
+            extra = {k: v for k, v in extra.items() if k != "model"}
+            extra["details_status"] = DETAILS_READY
+            update = {"$set": extra, "$unset": {"details_attempts": "", "details_retry_at": ""}}
+            print(f"✅ Added detailed specs for: {model}")
+        else:
+            attempt = attempts.get(model, 0) + 1
+            delay = min(DETAILS_RETRY_BASE_SEC * 2 ** (attempt - 1), DETAILS_RETRY_MAX_SEC)
+            update = {"$set": {
+                "details_status": DETAILS_FAILED,
+                "details_attempts": attempt,
+                "details_retry_at": _utcnow() + timedelta(seconds=delay),
+            }}
+            print(f"⚠️ No extra details found for {model} (attempt {attempt}, retry in {round(delay / 60)} min)")
+        operations.append(UpdateOne({"model": model}, update))
+
+    laptops_collection.bulk_write(operations, ordered=False)
+
+def _default_images():
+    folder_name = np.random.randint(1,10)
+    BASE_URL = f"http://127.0.0.1:5000/static/{folder_name}"
+    return [
+        f"{BASE_URL}/main.jpeg",
+        f"{BASE_URL}/side_view.jpeg",
+        f"{BASE_URL}/top_view.jpeg",
+        f"{BASE_URL}/close_up.jpeg",
+        f"{BASE_URL}/table_view.jpeg"
+    ]
+
+# MODIFIED: Added user_id to the function signature
+def store_laptop_recommendations(request_id, items, query_str, user_id=None):
+    """
+    Upserts the recommended laptops and links them to the user.
+    Round trips: one $in lookup, one unordered bulk_write, one user $push.
+    """
+    item_map = {}
     for item in items:
         doc = item.copy()
         model = doc.get("model")
@@ -84,88 +258,55 @@ def store_laptop_recommendations(request_id, items, query_str, user_id=None):
         if not model:
             print("Skipping item without model key")
             continue
-
+        # One document per product line, whatever spelling the LLM used
+        model = doc["model"] = canonical_model_name(model)
         item_map[model] = doc
-        existing = laptops_collection.find_one({"model": model})
-        print(f"Checking model in DB: {model} - Found: {bool(existing)}")
-        if not existing:
-            new_models.append({"model": model})
-            print(f"Marked for detail fetch: {model}")
 
-    # Step 2: Fetch details for new models (batch request)
-    fetched_details = []
-    if new_models:
-        print(f"\nFetching details for {len(new_models)} new models...")
-        try:
-            fetched_details = fetch_laptop_details(new_models, return_json=True)
-            # print(f"Fetched details for {fetched_details} models.")
-            if not isinstance(fetched_details, list):
-                print("⚠️ fetch_laptop_details did not return a list — wrapping result manually.")
-                fetched_details = [fetched_details]
-        except Exception as e:
-            print(f"Error fetching laptop details: {e}")
-    else:
-        print("No new models to fetch.\n")
+    if not item_map:
+        return
 
-    # Step 3: Build a mapping from model → detailed specs
-    fetched_map = {}
-    for detail in fetched_details or []:
-        model_name = detail.get("model")
-        if model_name:
-            fetched_map[model_name] = detail
-            print(f"Mapped fetched details for model: {detail}")
+    # Step 1: Single lookup for every model that already exists
+    existing_map = {
+        existing["model"]: existing
+        for existing in laptops_collection.find(
+            {"model": {"$in": list(item_map.keys())}},
+            {"model": 1, "images": 1, "details_status": 1, "details_requested_at": 1, "details_retry_at": 1}
+        )
+    }
 
-    # Step 4: Merge fetched specs and upsert into DB
+    # Step 2: Build all upserts; specs for new models are filled in later
+    new_models = []
+    operations = []
     added, updated = 0, 0
+    now = _utcnow()
 
     for model, doc in item_map.items():
-        existing = laptops_collection.find_one({"model": model})
-        print(f"\nProcessing model: {model}")
-        print(f"Existing in DB: {bool(existing)}")
-
-        folder_name = np.random.randint(1,10)
-        BASE_URL = f"http://127.0.0.1:5000/static/{folder_name}"
-        default_images = [
-            f"{BASE_URL}/main.jpeg",
-            f"{BASE_URL}/side_view.jpeg",
-            f"{BASE_URL}/top_view.jpeg",
-            f"{BASE_URL}/close_up.jpeg",
-            f"{BASE_URL}/table_view.jpeg"
-        ]
+        existing = existing_map.get(model)
 
         if not existing:
-            extra = fetched_map.get(model)
-            print(f"Storing new laptop model: {bool(extra)}")
-            if extra:
-                doc.update(extra)
-                print(f"✅ Added detailed specs for: {model}")
-            else:
-                print(f"⚠️ No extra details found for {model}")
-
-            doc["images"] = default_images
+            doc["images"] = _default_images()
             added += 1
         else:
-            # if(extra):
-            #     doc.update(extra)
-            #     print(f"✅ Merged detailed specs for existing model: {model}")
+            doc["images"] = existing.get("images") or _default_images()
             updated += 1
-            doc["images"] = existing.get("images", default_images)
+
+        # New models, lost claims and failures whose retry is due need a detail fetch;
+        # models already being fetched keep their claim
+        if needs_detail_fetch(existing, now):
+            doc["details_status"] = DETAILS_PENDING
+            doc["details_requested_at"] = now
+            new_models.append(model)
 
         doc["request_id"] = request_id
+        operations.append(UpdateOne({"model": model}, {"$set": doc}, upsert=True))
 
-        laptops_collection.update_one(
-            {"model": model},
-            {"$set": doc},
-            upsert=True
-        )
+    laptops_collection.bulk_write(operations, ordered=False)
 
     print(f"\nLaptop recommendations stored/updated successfully.")
     print(f"📦 Added: {added}, 🔁 Updated: {updated}\n")
 
-    # Step 5: Link User to Recommendations (in users_collection)
+    # Step 3: Link User to Recommendations (in users_collection)
     try:
-        from bson import ObjectId
-
         form_input = parse_query_str(query_str)
         
         if user_id:
@@ -188,60 +329,97 @@ def store_laptop_recommendations(request_id, items, query_str, user_id=None):
     except Exception as e:
         print(f"⚠️ Failed to update user recommendations history: {e}")
 
+    # Step 4: Fetch details for new models in the background (batch request)
+    if new_models:
+        enqueue_detail_fetch(new_models)
+    else:
+        print("No new models to fetch.\n")
+
+# Fields the recommendation / wishlist cards render. The long Why_in and
+# what_it_says texts are left out of list views.
+LIST_PROJECTION = {
+    "model": 1, "price_inr": 1, "why": 1, "images": 1,
+    "cpu": 1, "ram": 1, "storage": 1, "gpu": 1, "display": 1, "battery": 1,
+    "details_status": 1
+}
+
+# Everything a laptop document can expose through the API
+LAPTOP_FIELDS = set(LIST_PROJECTION) | {"Why_in", "what_it_says"}
+
+def resolve_projection(fields):
+    """
+    Turns a ?fields= value into a $project spec.
+    "summary" (default) -> card fields, "full" -> every public field,
+    otherwise a comma-separated list of field names. Returns None if a name is unknown.
+    """
+    if not fields or fields == "summary":
+        return LIST_PROJECTION
+    if fields == "full":
+        return {field: 1 for field in LAPTOP_FIELDS}
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    if not requested or any(f not in LAPTOP_FIELDS for f in requested):
+        return None
+    # model is always needed to join and key the cards
+    return {field: 1 for field in set(requested) | {"model"}}
+
+def _user_laptops_pipeline(user_oid, list_field, last_n=None, projection=None):
+    """
+    Joins a user's recommended/wishlist entries with laptops_collection in one round trip.
+    Each model appears once, with the form_input of its latest entry, in list order.
+    """
+    entries = f"${list_field}"
+    if last_n:
+        entries = {"$slice": [entries, -last_n]}
+
+    return [
+        {"$match": {"_id": user_oid}},
+        {"$project": {"_id": 0, "entry": entries}},
+        {"$unwind": {"path": "$entry", "includeArrayIndex": "position"}},
+        {"$match": {"entry.model": {"$type": "string"}}},
+        {"$group": {
+            "_id": "$entry.model",
+            "form_input": {"$last": "$entry.form_input"},
+            "position": {"$max": "$position"}
+        }},
+        {"$sort": {"position": 1}},
+        {"$lookup": {
+            "from": laptops_collection.name,
+            "localField": "_id",
+            "foreignField": "model",
+            "pipeline": [{"$project": projection or LIST_PROJECTION}],
+            "as": "laptop"
+        }},
+        {"$unwind": "$laptop"},
+        {"$replaceRoot": {"newRoot": {"$mergeObjects": [
+            "$laptop", {"form_input": {"$ifNull": ["$form_input", {}]}}
+        ]}}},
+        # Stringify ObjectId server-side for JSON serialization
+        {"$set": {"_id": {"$toString": "$_id"}}}
+    ]
+
 # 🛑 NEW FUNCTION: Performs the required merge for the /laptops route
-def get_merged_recommendations_for_user(user_id):
-    from bson import ObjectId
+def get_merged_recommendations_for_user(user_id, projection=None):
+    """Returns the user's 5 most recent recommendations merged with their form_input context."""
     try:
         user_oid = ObjectId(user_id)
-        
-        # 1. Fetch user document, only retrieving the last 5 recommended entries
-        user_doc = users_collection.find_one(
-            {"_id": user_oid}, 
-            {"recommended": {"$slice": -5}, "_id": 0} 
-        )
-        
-        if not user_doc or not user_doc.get("recommended"):
-            return []
-
-        recent_history = user_doc["recommended"]
-        
-        # 2. Map models to their specific form_input context
-        model_to_context_map = {
-            item['model']: item.get('form_input', {}) 
-            for item in recent_history if 'model' in item
-        }
-        model_list = list(model_to_context_map.keys())
-
-        if not model_list:
-            return []
-            
-        # 3. Fetch full laptop documents for these models
-        laptop_cursor = laptops_collection.find({"model": {"$in": model_list}})
-        laptops_data = list(laptop_cursor)
-        
-        merged_laptops = []
-        
-        # 4. Merge product details with the user's form_input context
-        for laptop in laptops_data:
-            model = laptop.get("model")
-            context = model_to_context_map.get(model)
-            
-            if context is not None:
-                # 🛑 Attach the form_input from the user's history
-                laptop["form_input"] = context
-                
-                # Convert ObjectId to string for JSON serialization
-                if "_id" in laptop:
-                    laptop["_id"] = str(laptop["_id"])
-                    
-                merged_laptops.append(laptop)
-                
-        return merged_laptops
+        pipeline = _user_laptops_pipeline(user_oid, "recommended", last_n=5, projection=projection)
+        return list(users_collection.aggregate(pipeline))
 
     except Exception as e:
         print(f"Error fetching merged recommendations for user {user_id}: {e}")
         return []
 
+def get_laptop_by_model(model):
+    """Full document for a single laptop (used by the lazy detail endpoint)."""
+    # Documents stored before names were canonicalized keep their original spelling
+    laptop = laptops_collection.find_one(
+        {"model": {"$in": [canonical_model_name(model), model]}}, {field: 1 for field in LAPTOP_FIELDS}
+    )
+    if laptop and "_id" in laptop:
+        laptop["_id"] = str(laptop["_id"])
+    return laptop
+
 def parse_query_str(query_str):
     """
     Converts a query string like 'key1: val1 ; key2: val2' into a dictionary.
@@ -291,64 +469,15 @@ def update_user_wishlist (user_id, model, action, query_str):
         print(f"Error updating wishlist: {e}")
         return False, str(e)
     
-from bson import ObjectId
-# Assuming 'users_collection' and 'laptops_collection' are available globally
-
-def get_wishlisted_laptops(user_id):
+def get_wishlisted_laptops(user_id, projection=None):
     """
     Fetches a user's wishlisted laptops, merging the product specs from
     laptops_collection with the form_input context from users_collection.
     """
     try:
         user_oid = ObjectId(user_id)
-        
-        # 1. Fetch user document, only retrieving the 'wishlist' field
-        user_doc = users_collection.find_one(
-            {"_id": user_oid},
-            {"wishlist": 1},
-        )
-
-        if not user_doc or not user_doc.get("wishlist"):
-            return []
-
-        wishlist_items = user_doc["wishlist"]
-        
-        # 2. Map models to their specific form_input context
-        # This creates a map: {'model_name': {'cpu_brand': 'Intel', ...}}
-        model_to_context_map = {
-            item['model']: item.get('form_input', {}) 
-            for item in wishlist_items 
-            if isinstance(item, dict) and 'model' in item
-        }
-        
-        model_list = list(model_to_context_map.keys())
-
-        if not model_list:
-            return []
-            
-        # 3. Fetch full laptop documents for these models
-        # Use $in for efficient look-up of all models
-        laptop_cursor = laptops_collection.find({"model": {"$in": model_list}})
-        laptops_data = list(laptop_cursor)
-        
-        merged_laptops = []
-        
-        # 4. Merge product details with the user's form_input context
-        for laptop in laptops_data:
-            model = laptop.get("model")
-            context = model_to_context_map.get(model)
-            
-            if context is not None:
-                # Attach the form_input from the user's history
-                laptop["form_input"] = context
-                
-                # Convert ObjectId to string for JSON serialization
-                if "_id" in laptop:
-                    laptop["_id"] = str(laptop["_id"])
-                    
-                merged_laptops.append(laptop)
-                
-        return merged_laptops
+        pipeline = _user_laptops_pipeline(user_oid, "wishlist", projection=projection)
+        return list(users_collection.aggregate(pipeline))
 
     except Exception as e:
         # Log the error for debugging (e.g., failed ObjectId conversion)
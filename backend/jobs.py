@@ -0,0 +1,204 @@
+import itertools
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+# Lower number = served first
+PRIORITY_INTERACTIVE = 0   # a user is waiting on this (e.g. review section opened)
+PRIORITY_PREFETCH = 10     # warm-up work kicked off after a search
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_registry = []  # every JobQueue, so /jobs/<id> can find a job in any of them
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted to a queue that is at capacity."""
+
+
+class Job:
+    def __init__(self, key, fn, args, kwargs, priority):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.status = JOB_QUEUED
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "key": self.key,
+            "status": self.status,
+            "priority": self.priority,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_sec": round((self.started_at or time.time()) - self.submitted_at, 3),
+        }
+
+
+class JobQueue:
+    """
+    Fixed pool of worker threads fed by a priority queue of bounded depth.
+    - Jobs are deduplicated by key while queued or running.
+    - A queued prefetch job is promoted if the same key is requested interactively.
+    - submit() raises QueueFull instead of growing without bound.
+    """
+
+    def __init__(self, name, workers=2, max_queue=50, history=500):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        # Unbounded heap: a priority bump leaves a stale entry behind, which must not
+        # take up capacity. max_queue is enforced on live queued jobs (_queued) instead.
+        self._queue = queue.PriorityQueue()
+        self._queued = 0
+        self._seq = itertools.count()
+        self._active = {}                 # key -> Job (queued or running)
+        self._jobs = OrderedDict()        # id -> Job (bounded history)
+        self._history = history
+        self._lock = threading.Lock()
+        self._threads = []
+        self._waits = deque(maxlen=200)   # recent queue wait times (sec)
+        self._durations = deque(maxlen=50)  # recent run times (sec), for ETAs
+        self.counters = {"submitted": 0, "deduplicated": 0, "rejected": 0, "completed": 0, "failed": 0}
+        _registry.append(self)
+
+    def submit(self, key, fn, *args, priority=PRIORITY_PREFETCH, **kwargs):
+        self._ensure_workers()
+        with self._lock:
+            existing = self._active.get(key)
+            if existing:
+                self.counters["deduplicated"] += 1
+                if existing.status == JOB_QUEUED and priority < existing.priority:
+                    # Re-queue at the higher priority; the stale entry is skipped by workers
+                    existing.priority = priority
+                    self._queue.put((priority, next(self._seq), existing))
+                return existing
+
+            if self._queued >= self.max_queue:
+                self.counters["rejected"] += 1
+                raise QueueFull(f"{self.name} queue is full ({self.max_queue} jobs)")
+            job = Job(key, fn, args, kwargs, priority)
+            self._queue.put((priority, next(self._seq), job))
+            self._queued += 1
+            self._active[key] = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._history:
+                self._jobs.popitem(last=False)
+            self.counters["submitted"] += 1
+            return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find_active(self, key):
+        with self._lock:
+            return self._active.get(key)
+
+    def _ensure_workers(self):
+        # Started lazily so forked servers (gunicorn) get live threads in each worker
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                t = threading.Thread(target=self._worker_loop, name=f"{self.name}-worker", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _worker_loop(self):
+        while True:
+            priority, _, job = self._queue.get()
+            try:
+                with self._lock:
+                    if job.status != JOB_QUEUED or priority != job.priority:
+                        continue  # stale entry left behind by a priority bump
+                    job.status = JOB_RUNNING
+                    self._queued -= 1
+                    job.started_at = time.time()
+                    self._waits.append(job.started_at - job.submitted_at)
+
+                try:
+                    job.fn(*job.args, **job.kwargs)
+                    status = JOB_DONE
+                except Exception as e:
+                    print(f"❌ Job {job.key} failed in {self.name}: {e}")
+                    job.error = str(e)
+                    status = JOB_FAILED
+
+                with self._lock:
+                    job.status = status
+                    job.finished_at = time.time()
+                    self._durations.append(job.finished_at - job.started_at)
+                    self.counters["completed" if status == JOB_DONE else "failed"] += 1
+                    if self._active.get(job.key) is job:
+                        del self._active[job.key]
+                job.done.set()
+            finally:
+                self._queue.task_done()
+
+    def eta(self, job, default_run_sec=30):
+        """Rough seconds until the job finishes, from recent run times and queue position."""
+        with self._lock:
+            if job.status in (JOB_DONE, JOB_FAILED):
+                return 0
+            durations = list(self._durations)
+            avg_run = sum(durations) / len(durations) if durations else default_run_sec
+            if job.status == JOB_RUNNING:
+                return max(round(avg_run - (time.time() - job.started_at), 1), 1)
+            ahead = sum(
+                1 for other in self._active.values()
+                if other is not job and (
+                    other.status == JOB_RUNNING
+                    or (other.priority, other.submitted_at) < (job.priority, job.submitted_at)
+                )
+            )
+            return round(avg_run * (ahead // self.workers + 1), 1)
+
+    def metrics(self):
+        with self._lock:
+            waits = list(self._waits)
+            running = sum(1 for j in self._active.values() if j.status == JOB_RUNNING)
+            return {
+                "name": self.name,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": len(self._active) - running,
+                "running": running,
+                **self.counters,
+                "avg_wait_sec": round(sum(waits) / len(waits), 3) if waits else 0,
+                "max_wait_sec": round(max(waits), 3) if waits else 0,
+            }
+
+
+def get_job(job_id):
+    for job_queue in _registry:
+        job = job_queue.get(job_id)
+        if job:
+            return job
+    return None
+
+
+def all_metrics():
+    return [job_queue.metrics() for job_queue in _registry]
+
+
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 2))
+ANALYSIS_QUEUE_SIZE = int(os.getenv("ANALYSIS_QUEUE_SIZE", 50))
+
+# Review analysis (scraping + VADER + KeyBERT), one job per model
+analysis_jobs = JobQueue("analysis", workers=ANALYSIS_WORKERS, max_queue=ANALYSIS_QUEUE_SIZE)
@@ -0,0 +1,109 @@
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+QUERY_CACHE_TTL_SECONDS = int(os.getenv("QUERY_CACHE_TTL_SECONDS", 6 * 60 * 60))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 512))
+
+
+def make_cache_key(canonical_str):
+    """Hashes a canonical query string so it can be used as a Mongo _id."""
+    normalized = " ".join(canonical_str.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _utcnow():
+    # Mongo TTL indexes compare expires_at against UTC
+    return datetime.now(timezone.utc)
+
+
+class QueryResultCache:
+    """
+    Two-tier cache for run_query results.
+    - Tier 1: in-process LRU (OrderedDict) with per-entry expiry.
+    - Tier 2: Mongo collection that survives restarts (optional).
+    """
+
+    def __init__(self, collection=None, max_entries=QUERY_CACHE_MAX_ENTRIES, ttl_seconds=QUERY_CACHE_TTL_SECONDS):
+        self.collection = collection
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at_epoch, data)
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        now = time.time()
+
+        # 1. In-process tier
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                expires_at, data = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return copy.deepcopy(data)
+                del self._entries[key]
+
+        # 2. Mongo tier
+        if self.collection is not None:
+            try:
+                doc = self.collection.find_one({"_id": key, "expires_at": {"$gt": _utcnow()}})
+            except Exception as e:
+                print(f"⚠️ Query cache lookup failed: {e}")
+                doc = None
+
+            if doc and doc.get("result") is not None:
+                expires_at = doc["expires_at"]
+                if expires_at.tzinfo is None:  # pymongo returns naive UTC unless tz_aware=True
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                remaining = (expires_at - _utcnow()).total_seconds()
+                self._remember(key, doc["result"], now + remaining)
+                with self._lock:
+                    self.counters["mongo_hits"] += 1
+                return copy.deepcopy(doc["result"])
+
+        with self._lock:
+            self.counters["misses"] += 1
+        return None
+
+    def set(self, key, data):
+        now = time.time()
+        self._remember(key, copy.deepcopy(data), now + self.ttl_seconds)
+
+        if self.collection is not None:
+            try:
+                self.collection.update_one(
+                    {"_id": key},
+                    {"$set": {
+                        "result": data,
+                        "created_at": _utcnow(),
+                        "expires_at": _utcnow() + timedelta(seconds=self.ttl_seconds)
+                    }},
+                    upsert=True
+                )
+            except Exception as e:
+                print(f"⚠️ Failed to persist query cache entry: {e}")
+
+    def _remember(self, key, data, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            hits = self.counters["memory_hits"] + self.counters["mongo_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "hit_rate": round(hits / lookups, 3) if lookups else 0
+            }
@@ -1,13 +1,21 @@
 import os
 import json
+import hashlib
 import concurrent.futures
+import multiprocessing
+import threading
 import time
 import re
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from keybert import KeyBERT
 from nltk.tokenize import sent_tokenize 
 from .reddit import scrape_reddit_reviews
-# from .youtube import scrape_youtube_reviews 
+from .sentiment_cache import SentimentCache, PersistentSentimentStore
+from .keyword_matcher import get_matcher
+from .embedding_cache import EmbeddingCache, CachedEmbedder
+from .batching import MicroBatcher
+from .cache_store import get_cache_store, NS_UNIFIED
+from .model_names import canonical_model_name, model_cache_key
 
 import nltk
 
@@ -28,11 +36,48 @@ for item in required_nltk:
         nltk.download(item, quiet=True)
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-os.makedirs(os.path.join(BASE_DIR, "reviews" ,"json_files", "unified_analysis"), exist_ok=True)
 
 # Initialize Models
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
 sia = SentimentIntensityAnalyzer()
-kw_model = KeyBERT('all-MiniLM-L6-v2')
+kw_model = KeyBERT(EMBEDDING_MODEL_NAME)
+
+# Every embed() from any analysis thread goes through one micro-batching dispatcher
+# (EMBED_BATCH_WAIT_MS=0 disables it and threads call the model directly)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+EMBED_BATCH_WAIT_MS = float(os.getenv("EMBED_BATCH_WAIT_MS", 5))
+embedding_batcher = None
+if EMBED_BATCH_WAIT_MS > 0:
+    embedding_batcher = MicroBatcher(kw_model.model, max_batch_size=EMBED_BATCH_SIZE, max_wait_ms=EMBED_BATCH_WAIT_MS)
+    kw_model.model = embedding_batcher
+
+# Persistent sentence-embedding cache shared by all workers (EMBEDDING_CACHE_CAPACITY=0 disables it)
+EMBEDDING_CACHE_CAPACITY = int(os.getenv("EMBEDDING_CACHE_CAPACITY", 100_000))
+EMBEDDING_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR", os.path.join(BASE_DIR, "reviews", "json_files", "embedding_cache")
+)
+embedding_cache = None
+if EMBEDDING_CACHE_CAPACITY > 0:
+    embedding_cache = EmbeddingCache(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL_NAME, capacity=EMBEDDING_CACHE_CAPACITY)
+    kw_model.model = CachedEmbedder(kw_model.model, embedding_cache)
+
+def embedding_metrics():
+    """Batching and cache counters for the shared sentence-transformer."""
+    return {
+        "batcher": embedding_batcher.metrics() if embedding_batcher else None,
+        "cache": embedding_cache.stats() if embedding_cache else None,
+    }
+
+# Cross-run VADER cache (an SQLite file, LRU-capped; SENTIMENT_CACHE_PATH="" disables it).
+# With the embedding cache above, it keeps refresh runs cheap: after an incremental
+# scrape only the new reviews/sentences/n-grams go through VADER and MiniLM again.
+SENTIMENT_CACHE_PATH = os.getenv(
+    "SENTIMENT_CACHE_PATH", os.path.join(BASE_DIR, "reviews", "json_files", "sentiment_scores.sqlite")
+)
+SENTIMENT_CACHE_MAX_ENTRIES = int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", 200_000))
+sentiment_store = (
+    PersistentSentimentStore(SENTIMENT_CACHE_PATH, SENTIMENT_CACHE_MAX_ENTRIES) if SENTIMENT_CACHE_PATH else None
+)
 
 def clean_text(text):
     text = re.sub(r"http\S+", "", text)
@@ -85,15 +130,27 @@ tech_concepts = [
     'game', 'fps', 'gaming', 'render', 'export', 'code', 'compile', 'linux'
 ]
 
-def classify_reviews_by_user(reviews, keywords_dict):
+def classify_reviews_by_user(reviews, keywords_dict, memberships=None):
+    """Groups reviews by user type (whole-word keyword hits, one regex pass per review)."""
+    matcher = get_matcher(keywords_dict)
+    if memberships is None:
+        memberships = matcher.match_all(reviews)
     categorized = {user: [] for user in keywords_dict.keys()}
-    for review in reviews:
-        review_lower = review.lower()
-        for user, keywords in keywords_dict.items():
-            if any(word in review_lower for word in keywords):
-                categorized[user].append(review)
+    for review, bitmap in zip(reviews, memberships):
+        for user in matcher.groups_in(bitmap):
+            categorized[user].append(review)
     return categorized
 
+def score_review_sentences(review, sia):
+    """(compound, sentence) for every snippet-sized sentence of a review."""
+    clean_rev = re.sub(r"\*\*.*?\*\*", "", review).replace("x200B", "")
+    scored = []
+    for sent in sent_tokenize(clean_rev):
+        clean_sent = sent.strip()
+        if 20 < len(clean_sent) < 300: 
+            scored.append((sia.polarity_scores(clean_sent)['compound'], clean_sent))
+    return scored
+
 def analyze_sentiment_stats(reviews, sia):
     """Lightweight sentiment stats (no snippets)"""
     pos = neg = neu = 0
@@ -114,16 +171,31 @@ def analyze_sentiment_stats(reviews, sia):
     }
 
 def analyze_sentiment_detailed(reviews, sia):
-    """Detailed sentiment with per-review labeling for Keyword extraction"""
-    agg = analyze_sentiment_stats(reviews, sia)
+    """Detailed sentiment with per-review labeling for Keyword extraction (one score per review)"""
+    pos = neg = neu = 0
+    compound_total = 0
     per_review = []
     for r in reviews:
         score = sia.polarity_scores(r)['compound']
-        label = "positive" if score >= 0.05 else "negative" if score <= -0.05 else "neutral"
+        compound_total += score
+        if score >= 0.05:
+            label = "positive"; pos += 1
+        elif score <= -0.05:
+            label = "negative"; neg += 1
+        else:
+            label = "neutral"; neu += 1
         per_review.append({"text": r, "label": label, "score": score})
+
+    total = len(reviews)
+    agg = {
+        "positive": pos, "neutral": neu, "negative": neg, "total_reviews": total,
+        "sentiment_score": round((pos - neg)/total, 3) if total else 0,
+        "avg_compound": round(compound_total/total, 3) if total else 0
+    }
     return agg, per_review
 
-def filter_keywords(candidates, is_positive_bucket=False):
+def filter_keywords(candidates, is_positive_bucket=False, scorer=None):
+    scorer = scorer or sia
     filtered = []
     for kw, score in candidates:
         kw_clean = re.sub(r"[^a-zA-Z0-9\s]", "", kw).strip()
@@ -135,7 +207,7 @@ def filter_keywords(candidates, is_positive_bucket=False):
         if is_positive_bucket:
             if any(bad_word in kw_clean for bad_word in negative_concepts): continue
             if not any(tech in kw_clean for tech in tech_concepts): continue 
-            kw_score = sia.polarity_scores(kw_clean)['compound']
+            kw_score = scorer.polarity_scores(kw_clean)['compound']
             if kw_score < -0.05: continue
 
         try:
@@ -147,56 +219,112 @@ def filter_keywords(candidates, is_positive_bucket=False):
         filtered.append(kw_clean)
     return list(dict.fromkeys(filtered))[:5]
 
-def analyze_unified_groups(all_reviews, sia, kw_model, user_keywords):
+# --- KEYBERT ---
+KEYBERT_VECTORIZER_PARAMS = dict(keyphrase_ngram_range=(1, 2), stop_words='english')
+KEYBERT_MMR_PARAMS = dict(use_maxsum=False, use_mmr=True, diversity=0.7, top_n=20)
+GENERIC_SEEDS = ['performance', 'battery', 'screen'] # Generic seeds or custom per group
+
+_seed_embeddings = {}
+
+def get_seed_embedding(kw_model, seeds):
+    """Mean embedding of a seed list, computed once per model/seed list."""
+    key = (id(kw_model), tuple(seeds))
+    if key not in _seed_embeddings:
+        _seed_embeddings[key] = kw_model.model.embed(list(seeds)).mean(axis=0, keepdims=True)
+    return _seed_embeddings[key]
+
+# Seed embeddings are shared by every analysis; compute them at startup
+get_seed_embedding(kw_model, tech_concepts)
+get_seed_embedding(kw_model, GENERIC_SEEDS)
+
+def extract_keywords_batch(kw_model, docs, seed_lists):
     """
-    Analyzes the merged pool of reviews by User Group (Gamers, Students, etc.)
-    Returns: Keywords, Sentiment, Snippets per Group.
+    Guided KeyBERT over several documents in one go:
+    - all documents are embedded in a single forward pass,
+    - candidate n-grams are vectorized over the union of documents, so an
+      n-gram shared by several documents is embedded once,
+    - seed embeddings come from get_seed_embedding() and are blended into each
+      document embedding with the same 3:1 weighting KeyBERT uses for seed_keywords.
+    Returns one [(keyword, score), ...] list per document.
+    """
+    if not docs:
+        return []
+
+    doc_embeddings, word_embeddings = kw_model.extract_embeddings(docs, **KEYBERT_VECTORIZER_PARAMS)
+    for i, seeds in enumerate(seed_lists):
+        doc_embeddings[i] = (3 * doc_embeddings[i] + get_seed_embedding(kw_model, seeds)[0]) / 4
+
+    results = kw_model.extract_keywords(
+        docs, doc_embeddings=doc_embeddings, word_embeddings=word_embeddings,
+        **KEYBERT_VECTORIZER_PARAMS, **KEYBERT_MMR_PARAMS
+    )
+    # KeyBERT unwraps single-document results
+    return [results] if len(docs) == 1 else results
+
+# Unified analysis files are rewritten as each tier finishes; "completeness" says how far along they are
+COMPLETENESS_STATS = "stats"          # platform stats + per-group sentiment counts (VADER only)
+COMPLETENESS_SNIPPETS = "snippets"    # + example sentences per group
+COMPLETENESS_FULL = "full"            # + KeyBERT keywords
+COMPLETENESS_ORDER = [COMPLETENESS_STATS, COMPLETENESS_SNIPPETS, COMPLETENESS_FULL]
+
+# When a tier raises, the last finished tier is published with a "failure" marker
+# and nobody resubmits the analysis until the marker's retry_at has passed
+ANALYSIS_TIER_RETRY_SEC = float(os.getenv("ANALYSIS_TIER_RETRY_SEC", 1800))
+
+def is_complete(data):
+    # Files written before tiers existed have no field and are complete
+    return data.get("completeness", COMPLETENESS_FULL) == COMPLETENESS_FULL
+
+def failed_recently(data):
+    """True while a partial analysis whose next tier failed is waiting out its retry time."""
+    failure = data.get("failure")
+    return bool(failure) and time.time() < failure.get("retry_at", 0)
+
+def analyze_unified_groups_tiers(all_reviews, sia, kw_model, user_keywords):
+    """
+    Analyzes the merged pool of reviews by User Group (Gamers, Students, etc.),
+    cheapest stage first. Yields (completeness, group_analysis) after each tier;
+    the group_analysis dict grows in place.
     """
     clean_reviews = [clean_text(r) for r in all_reviews if len(r.strip()) > 20]
-    user_categorized = classify_reviews_by_user(clean_reviews, user_keywords)
-    
+
+    # One matcher pass gives the review x group bitmap reused by every stage below
+    memberships = get_matcher(user_keywords).match_all(clean_reviews)
+    user_categorized = classify_reviews_by_user(clean_reviews, user_keywords, memberships)
+
     sentiment_results = {}
     keywords_results = {}
     example_snippets = {}
+    group_analysis = {"sentiment_by_group": sentiment_results}
+
+    # Tier 1: per-group sentiment counts
+    # (user, polarity) -> text blob, extracted together in tier 3
+    keyword_jobs = []
 
     for user in user_keywords.keys():
         user_reviews = user_categorized.get(user, [])
         agg, per_review = analyze_sentiment_detailed(user_reviews, sia)
-        
+        sentiment_results[user] = agg
+
         pos_text_list = [r["text"] for r in per_review if r["label"] == "positive"]
         neg_text_list = [r["text"] for r in per_review if r["label"] == "negative"]
-        
-        # Keyword Extraction
-        def run_keybert(text_list, seeds, is_positive=False):
-            if not text_list: return []
-            text_blob = " ".join(text_list)
-            current_seeds = tech_concepts if is_positive else seeds
-            candidates = kw_model.extract_keywords(
-                text_blob, keyphrase_ngram_range=(1, 2), stop_words='english',
-                use_maxsum=False, use_mmr=True, diversity=0.7, top_n=20, 
-                seed_keywords=current_seeds
-            )
-            return filter_keywords(candidates, is_positive_bucket=is_positive)
-
-        seeds = ['performance', 'battery', 'screen'] # Generic seeds or custom per group
-        keywords_results[user] = {
-            "positive": run_keybert(pos_text_list, seeds, is_positive=True), 
-            "negative": run_keybert(neg_text_list, seeds, is_positive=False)
-        }
-        
-        # Snippets
-        all_sentences = []
-        for review in user_reviews:
-            clean_rev = re.sub(r"\*\*.*?\*\*", "", review).replace("x200B", "")
-            sentences = sent_tokenize(clean_rev) 
-            all_sentences.extend(sentences)
 
+        keywords_results[user] = {"positive": [], "negative": []}
+        if pos_text_list:
+            keyword_jobs.append((user, "positive", " ".join(pos_text_list), tech_concepts))
+        if neg_text_list:
+            keyword_jobs.append((user, "negative", " ".join(neg_text_list), GENERIC_SEEDS))
+
+    yield COMPLETENESS_STATS, group_analysis
+
+    # Tier 2: snippets. A review in several groups is sentence-split and scored only once
+    review_sentences = {}
+    for user in user_keywords.keys():
         scored_sentences = []
-        for sent in all_sentences:
-            clean_sent = sent.strip()
-            if 20 < len(clean_sent) < 300: 
-                score = sia.polarity_scores(clean_sent)['compound']
-                scored_sentences.append((score, clean_sent))
+        for review in user_categorized.get(user, []):
+            if review not in review_sentences:
+                review_sentences[review] = score_review_sentences(review, sia)
+            scored_sentences.extend(review_sentences[review])
 
         scored_sentences.sort(key=lambda x: x[0], reverse=True)
         pos_snips = [s[1] for s in scored_sentences if s[0] > 0.6][:3]
@@ -204,48 +332,135 @@ def analyze_unified_groups(all_reviews, sia, kw_model, user_keywords):
         neg_snips = [s[1] for s in scored_sentences if s[0] < -0.4][:3]
 
         example_snippets[user] = {"positive": pos_snips, "negative": neg_snips}
-        sentiment_results[user] = agg
 
+    group_analysis["snippets_by_group"] = example_snippets
+    yield COMPLETENESS_SNIPPETS, group_analysis
+
+    # Tier 3: Keyword Extraction (one batched KeyBERT call for every group/polarity)
+    candidates_per_job = extract_keywords_batch(
+        kw_model, [job[2] for job in keyword_jobs], [job[3] for job in keyword_jobs]
+    )
+    for (user, polarity, _, _), candidates in zip(keyword_jobs, candidates_per_job):
+        keywords_results[user][polarity] = filter_keywords(
+            candidates, is_positive_bucket=(polarity == "positive"), scorer=sia
+        )
+
+    group_analysis["keywords_by_group"] = keywords_results
+    yield COMPLETENESS_FULL, group_analysis
+
+def analyze_unified_groups(all_reviews, sia, kw_model, user_keywords):
+    """
+    Analyzes the merged pool of reviews by User Group (Gamers, Students, etc.)
+    Returns: Keywords, Sentiment, Snippets per Group.
+    """
+    for _, group_analysis in analyze_unified_groups_tiers(all_reviews, sia, kw_model, user_keywords):
+        pass
     return {
-        "sentiment_by_group": sentiment_results,
-        "keywords_by_group": keywords_results,
-        "snippets_by_group": example_snippets
+        "sentiment_by_group": group_analysis["sentiment_by_group"],
+        "keywords_by_group": group_analysis["keywords_by_group"],
+        "snippets_by_group": group_analysis["snippets_by_group"]
     }
 
+# --- Unified cache versioning ---
+# Bump when the analysis logic changes in a way the config hash can't see
+ANALYZER_VERSION = 2
+UNIFIED_CACHE_TTL_SEC = float(os.getenv("UNIFIED_CACHE_TTL_DAYS", 30)) * 86400
+DUMMY_CACHE_TTL_SEC = float(os.getenv("DUMMY_CACHE_TTL_SEC", 900))  # placeholders get replaced soon
+# How often a served analysis checks its sources for new reviews (the scrapers only fetch the delta)
+REVIEWS_REFRESH_SEC = float(os.getenv("REVIEWS_REFRESH_HOURS", 24)) * 3600
+
+def analysis_config_hash():
+    """Fingerprint of everything that shapes the output besides code: taxonomies, seeds, KeyBERT params."""
+    config = {
+        "user_keywords": user_keywords,
+        "laptop_stopwords": sorted(laptop_stopwords),
+        "negative_concepts": negative_concepts,
+        "tech_concepts": tech_concepts,
+        "generic_seeds": GENERIC_SEEDS,
+        "vectorizer": KEYBERT_VECTORIZER_PARAMS,
+        "mmr": KEYBERT_MMR_PARAMS,
+        "embedding_model": EMBEDDING_MODEL_NAME,
+    }
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=list).encode("utf-8")).hexdigest()[:16]
+
+ANALYSIS_CONFIG_HASH = analysis_config_hash()
+
+def is_fresh(data):
+    """
+    False for entries from another analyzer version/config, past their TTL (short for dummies),
+    or not checked for new reviews in the last REVIEWS_REFRESH_HOURS.
+    """
+    meta = data.get("cache") or {}
+    if meta.get("analyzer_version") != ANALYZER_VERSION or meta.get("config_hash") != ANALYSIS_CONFIG_HASH:
+        return False
+    now = time.time()
+    if data.get("is_dummy"):
+        return now - meta.get("created_at", 0) < DUMMY_CACHE_TTL_SEC
+    if now - meta.get("created_at", 0) >= UNIFIED_CACHE_TTL_SEC:
+        return False
+    return now - meta.get("checked_at", meta.get("created_at", 0)) < REVIEWS_REFRESH_SEC
+
+def unified_cache_key(model_name):
+    return f"{model_cache_key(model_name)}_unified"
+
 def load_unified_cache(model_name):
-    filename = f"{model_name.replace(' ', '_')}_unified.json"
-    filepath = os.path.join(BASE_DIR, "reviews", "json_files", "unified_analysis", filename)
-    if os.path.exists(filepath):
-        print(f"♻️ Unified Analysis cache hit: {filename}")
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return None
+    key = unified_cache_key(model_name)
+    data = get_cache_store().get(NS_UNIFIED, key)
+    if data is not None:
+        print(f"♻️ Unified Analysis cache hit: {key}")
+    return data
 
 def save_unified_cache(model_name, data):
-    filename = f"{model_name.replace(' ', '_')}_unified.json"
-    filepath = os.path.join(BASE_DIR, "reviews", "json_files", "unified_analysis", filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"💾 Saved Unified Analysis: {filename}")
-
-def process_model(model_name):
-    print(f"🔹 Processing model: {model_name}")
-    start_model = time.time()
+    key = unified_cache_key(model_name)
+    data["cache"] = {
+        "analyzer_version": ANALYZER_VERSION,
+        "config_hash": ANALYSIS_CONFIG_HASH,
+        "created_at": time.time(),
+    }
+    # Readers may be polling between tiers; the store swaps entries atomically
+    get_cache_store().put(NS_UNIFIED, key, data)
+    print(f"💾 Saved Unified Analysis ({data.get('completeness', COMPLETENESS_FULL)}): {key}")
 
-    # 1. FAST EXIT: Check Unified Cache
-    cached_data = load_unified_cache(model_name)
-    if cached_data:
-        return cached_data
+def mark_unified_checked(model_name, data):
+    """
+    The sources had nothing new: keep the analysis and restart its refresh clock,
+    so it isn't served as stale (and refreshed again) on every request.
+    """
+    data["cache"] = {**(data.get("cache") or {}), "checked_at": time.time()}
+    if is_fresh(data):
+        get_cache_store().put(NS_UNIFIED, unified_cache_key(model_name), data)
+    else:
+        # Older analyzer/config or past its TTL, but nothing new to redo it with: re-stamp what we have
+        save_unified_cache(model_name, data)
+    print(f"✅ No new reviews since the last analysis: {unified_cache_key(model_name)}")
+
+def refresh_failed_recently(data):
+    """True while a complete entry's last refresh failed and its retry time hasn't come (don't queue another)."""
+    return time.time() < (data.get("cache") or {}).get("refresh_failed_until", 0)
+
+def save_final_tier(model_name, data):
+    """
+    on_tier for a background refresh: the stale (but complete) file stays until the new one is complete.
+    If the refresh fails partway, the existing entry records when it may be retried.
+    """
+    if is_complete(data):
+        save_unified_cache(model_name, data)
+    elif data.get("failure"):
+        current = load_unified_cache(model_name)
+        if current is None or not is_complete(current):
+            return
+        current["cache"] = {
+            **(current.get("cache") or {}),
+            "refresh_failed_until": data["failure"]["retry_at"],
+            "refresh_error": f"{data['failure']['tier']}: {data['failure']['error']}",
+        }
+        get_cache_store().put(NS_UNIFIED, unified_cache_key(model_name), current)
+        print(f"⚠️ Refresh of {unified_cache_key(model_name)} failed; keeping the existing analysis")
 
-    # 2. Parallel Fetching (Reddit + YouTube)
-    # Add youtube here: ('youtube', scrape_youtube_reviews)
-    sources = [
-        ('reddit', scrape_reddit_reviews),
-        # ('youtube', scrape_youtube_reviews) 
-    ]
-    
+def fetch_reviews(model_name, sources):
+    """I/O-bound scraping: every source runs on its own thread. Returns {src: [reviews]}."""
     raw_data = {}
-    
+
     print(f"🕵️ Fetching reviews for {model_name} from {len(sources)} sources...")
     with concurrent.futures.ThreadPoolExecutor(max_workers=len(sources)) as executor:
         future_to_src = {executor.submit(func, model_name): src for src, func in sources}
@@ -256,13 +471,170 @@ def process_model(model_name):
             except Exception as e:
                 print(f"⚠️ Failed to fetch {src}: {e}")
                 raw_data[src] = []
+    return raw_data
 
-    # 3. Merge Data for Group Analysis
+def analyze_reviews(model_name, raw_data, started_at=None, on_tier=None):
+    """
+    CPU-bound NLP (VADER, tokenizing, KeyBERT) over already fetched reviews.
+    Only uses module-level models, so it can run in an analysis worker process.
+    on_tier(model_name, output) is called with the output document after each
+    tier (see COMPLETENESS_ORDER); the last one is returned. If a later tier
+    raises, the last finished one is published again with a "failure" marker.
+    """
+    started_at = started_at or time.time()
     all_reviews_unified = []
     for src, reviews in raw_data.items():
         all_reviews_unified.extend(reviews)
+
+    print(f"🧠 Analyzing Unified Data ({len(all_reviews_unified)} reviews total)...")
+
+    # Every stage shares one memo table, so each unique text is scored by VADER once
+    scorer = SentimentCache(sia, store=sentiment_store)
+
+    # A. Platform Specific Stats (Lightweight)
+    platform_stats = {}
+    for src, reviews in raw_data.items():
+        platform_stats[src] = analyze_sentiment_stats(reviews, scorer)
     
-    if not all_reviews_unified:
+    # B. User Group Analysis, published tier by tier (sentiment -> snippets -> keywords)
+    tiers = analyze_unified_groups_tiers(all_reviews_unified, scorer, kw_model, user_keywords)
+    output = None
+    while True:
+        try:
+            completeness, group_analysis = next(tiers)
+        except StopIteration:
+            break
+        except Exception as e:
+            if output is None:
+                raise
+            # Keep what finished; retrying right away would most likely fail the same way
+            failed_tier = COMPLETENESS_ORDER[COMPLETENESS_ORDER.index(output["completeness"]) + 1]
+            print(f"❌ {failed_tier} tier failed for {model_name}: {e}")
+            output["failure"] = {
+                "tier": failed_tier, "error": str(e), "retry_at": time.time() + ANALYSIS_TIER_RETRY_SEC
+            }
+            if on_tier is not None:
+                on_tier(model_name, output)
+            break
+
+        output = {
+            "model_name": model_name,
+            "total_reviews": len(all_reviews_unified),
+            "platform_stats": platform_stats,  # e.g. {"reddit": {pos: 10...}, "youtube": {pos: 5...}}
+            "source_counts": {src: len(reviews) for src, reviews in raw_data.items()},
+            "group_analysis": group_analysis,  # Contains sentiment, keywords, snippets per group
+            "completeness": completeness,
+            "timings": {
+                "total_time_sec": round(time.time() - started_at, 2)
+            }
+        }
+        if on_tier is not None:
+            on_tier(model_name, output)
+
+    print(f"📊 Sentiment cache for {model_name}: {scorer.stats()}")
+    if embedding_cache is not None:
+        print(f"📊 Embedding cache: {embedding_cache.stats()}")
+    if sentiment_store is not None:
+        sentiment_store.flush()
+
+    return output
+
+# NLP engine: "thread" analyzes in the calling thread (VADER/NLTK/KeyBERT hold the GIL,
+# so concurrent models run one at a time); "process" ships the analysis to worker processes
+ANALYSIS_ENGINE = os.getenv("ANALYSIS_ENGINE", "thread")
+ANALYSIS_PROCESSES = int(os.getenv("ANALYSIS_PROCESSES", os.cpu_count() or 1))
+
+_analysis_pool = None
+_analysis_pool_lock = threading.Lock()
+
+def _init_analysis_worker():
+    # SQLite connections must not be shared with the parent after a fork
+    if embedding_cache is not None:
+        embedding_cache.reset_connections()
+
+def make_analysis_pool(workers):
+    """
+    Process pool whose workers already hold VADER and MiniLM.
+    Where available, a fork server imports this module (loading the models) once
+    and every worker is forked from it, sharing those pages copy-on-write.
+    Otherwise (Windows/macOS spawn) each worker loads the models once on start.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload([__spec__.name if __spec__ else __name__])
+    else:
+        ctx = multiprocessing.get_context("spawn")
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=ctx, initializer=_init_analysis_worker
+    )
+
+def get_analysis_pool():
+    global _analysis_pool
+    with _analysis_pool_lock:
+        if _analysis_pool is None:
+            print(f"🧩 Starting {ANALYSIS_PROCESSES} analysis worker processes...")
+            _analysis_pool = make_analysis_pool(ANALYSIS_PROCESSES)
+        return _analysis_pool
+
+def start_analysis_pool():
+    """Warms every worker up front so the first request doesn't pay for model loading."""
+    pool = get_analysis_pool()
+    for f in [pool.submit(time.sleep, 0.1) for _ in range(ANALYSIS_PROCESSES)]:
+        f.result()
+
+# Comma-separated scrapers used by process_model, e.g. REVIEW_SOURCES=reddit,youtube
+# (YouTube comment ingestion is capped per video, see youtube.py)
+REVIEW_SOURCES = [s.strip() for s in os.getenv("REVIEW_SOURCES", "reddit").split(",") if s.strip()]
+
+def review_sources():
+    sources = []
+    for name in REVIEW_SOURCES:
+        if name == 'reddit':
+            sources.append(('reddit', scrape_reddit_reviews))
+        elif name == 'youtube':
+            # Imported only when enabled: pulls in the youtube-* scraping packages
+            from .youtube import scrape_youtube_reviews
+            sources.append(('youtube', scrape_youtube_reviews))
+        else:
+            print(f"⚠️ Unknown review source in REVIEW_SOURCES: {name}")
+    return sources
+
+def process_model(model_name):
+    # Name variants ("IdeaPad Slim 5 Gen 8", "Lenovo Ideapad Slim 5") share one analysis
+    model_name = canonical_model_name(model_name)
+    print(f"🔹 Processing model: {model_name}")
+    start_model = time.time()
+
+    # 1. FAST EXIT: Check Unified Cache
+    # (a partial tier left behind by an interrupted run, or a stale entry, is recomputed)
+    cached_data = load_unified_cache(model_name)
+    if cached_data and is_complete(cached_data) and is_fresh(cached_data):
+        return cached_data
+    # Refreshing a complete entry: keep serving it until the new analysis is complete
+    revalidating = bool(cached_data and is_complete(cached_data))
+    if revalidating and refresh_failed_recently(cached_data):
+        return cached_data
+    on_tier = save_final_tier if revalidating else save_unified_cache
+
+    # 2. Parallel Fetching (Reddit + YouTube) - always on threads
+    sources = review_sources()
+    raw_data = fetch_reviews(model_name, sources)
+
+    # Refreshes are incremental: if no source returned anything new, the analysis still stands
+    source_counts = {src: len(reviews) for src, reviews in raw_data.items()}
+    if (revalidating and not cached_data.get("is_dummy")
+            and cached_data.get("source_counts") == source_counts
+            and is_fresh({**cached_data, "cache": {**(cached_data.get("cache") or {}), "checked_at": time.time()}})):
+        mark_unified_checked(model_name, cached_data)
+        return cached_data
+
+    # 3. Merge Data for Group Analysis
+    if not any(raw_data.values()):
+        if revalidating and not cached_data.get("is_dummy"):
+            print(f"⚠️ No new reviews for {model_name}; keeping the existing analysis.")
+            mark_unified_checked(model_name, cached_data)
+            return cached_data
+
         # print(f"❌ No reviews found for {model_name}. Saving EMPTY analysis to stop loop.")
         
         # Create an empty data structure
@@ -284,30 +656,13 @@ def process_model(model_name):
         
         return dummy_output
 
-    print(f"🧠 Analyzing Unified Data ({len(all_reviews_unified)} reviews total)...")
-
-    # 4. Run Analysis
-    # A. Platform Specific Stats (Lightweight)
-    platform_stats = {}
-    for src, reviews in raw_data.items():
-        platform_stats[src] = analyze_sentiment_stats(reviews, sia)
-    
-    # B. User Group Analysis (Heavyweight - Keywords & Snippets)
-    group_analysis = analyze_unified_groups(all_reviews_unified, sia, kw_model, user_keywords)
-
-    # 5. Construct Final Output
-    output = {
-        "model_name": model_name,
-        "total_reviews": len(all_reviews_unified),
-        "platform_stats": platform_stats,  # e.g. {"reddit": {pos: 10...}, "youtube": {pos: 5...}}
-        "group_analysis": group_analysis,  # Contains sentiment, keywords, snippets per group
-        "timings": {
-            "total_time_sec": round(time.time() - start_model, 2)
-        }
-    }
-
-    save_unified_cache(model_name, output)
-    return output
+    # 4. Run Analysis (in a worker process when ANALYSIS_ENGINE=process);
+    # every tier is saved as soon as it is ready so the UI can render early
+    if ANALYSIS_ENGINE == "process":
+        return get_analysis_pool().submit(
+            analyze_reviews, model_name, raw_data, start_model, on_tier
+        ).result()
+    return analyze_reviews(model_name, raw_data, start_model, on_tier=on_tier)
 
 def process_models(models_list):
     all_outputs = []
@@ -329,6 +684,7 @@ def get_dummy_data(model_name):
         "model_name": model_name,
         "total_reviews": 125,
         "is_dummy": True, # Flag for UI if needed
+        "completeness": COMPLETENESS_FULL,
         "platform_stats": {
             "reddit": {
                 "positive": 85,
@@ -0,0 +1,129 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+class _EmbedRequest:
+    __slots__ = ("documents", "submitted_at", "result", "error", "done")
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.submitted_at = time.perf_counter()
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Owns a KeyBERT embedding backend and serves every thread's embed() calls
+    from one dispatcher thread, coalescing requests that arrive within
+    max_wait_ms into a single forward pass of up to max_batch_size texts.
+    - A lone caller is dispatched at once: the window is only held open while
+      other callers are still waiting to be picked up.
+    - Anything else (embedding_model, etc.) is served by the real backend.
+    """
+
+    def __init__(self, backend, max_batch_size=64, max_wait_ms=5):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=500)     # texts per forward pass
+        self._batch_requests = deque(maxlen=500)  # callers per forward pass
+        self._queue_waits = deque(maxlen=500)     # sec from submit to dispatch
+        self.counters = {"requests": 0, "texts": 0, "batches": 0, "failed_batches": 0}
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def _ensure_dispatcher(self):
+        # Threads don't survive fork (process engine), so restart per process
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._inflight = 0
+                self._inflight_lock = threading.Lock()
+                threading.Thread(target=self._run, daemon=True, name="embed-batcher").start()
+                self._pid = os.getpid()
+
+    def embed(self, documents, verbose=False):
+        documents = list(documents)
+        if not documents:
+            return self.backend.embed(documents, verbose=verbose)
+        self._ensure_dispatcher()
+
+        request = _EmbedRequest(documents)
+        with self._inflight_lock:
+            self._inflight += 1
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].documents)
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch_size:
+                with self._inflight_lock:
+                    if len(batch) >= self._inflight:
+                        break  # nobody else is waiting; don't hold the window open
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.documents)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        dispatched_at = time.perf_counter()
+        documents = [doc for request in batch for doc in request.documents]
+        try:
+            vectors = np.asarray(self.backend.embed(documents))
+            offset = 0
+            for request in batch:
+                request.result = vectors[offset:offset + len(request.documents)]
+                offset += len(request.documents)
+        except Exception as e:
+            print(f"⚠️ Embedding batch of {len(documents)} texts failed: {e}")
+            self.counters["failed_batches"] += 1
+            for request in batch:
+                request.error = e
+
+        self.counters["requests"] += len(batch)
+        self.counters["texts"] += len(documents)
+        self.counters["batches"] += 1
+        self._batch_sizes.append(len(documents))
+        self._batch_requests.append(len(batch))
+        self._queue_waits.extend(dispatched_at - request.submitted_at for request in batch)
+
+        with self._inflight_lock:
+            self._inflight -= len(batch)
+        for request in batch:
+            request.done.set()
+
+    def metrics(self):
+        def avg(values):
+            return round(sum(values) / len(values), 2) if values else 0
+
+        return {
+            **self.counters,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_batch_texts": avg(self._batch_sizes),
+            "avg_batch_requests": avg(self._batch_requests),
+            "avg_queue_wait_ms": avg([w * 1000 for w in self._queue_waits]),
+        }
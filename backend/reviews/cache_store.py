@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+JSON_FILES_DIR = os.path.join(BASE_DIR, "reviews", "json_files")
+
+# Namespaces (one folder each in the file layout)
+NS_UNIFIED = "unified_analysis"
+NS_REDDIT_RAW = "reddit_raw_reviews"
+NS_YOUTUBE_RAW = "youtube_raw_reviews"
+NS_NEGATIVE = "negative_lookups"  # scrapes that came back empty, see negative_cache.py
+
+
+def valid_key(key):
+    """Keys are file-name stems: no path separators or parent references."""
+    return bool(key) and "/" not in key and "\\" not in key and ".." not in key and "\0" not in key
+
+
+class FileStore:
+    """
+    The original layout: json_files/<namespace>/<key>.json, one pretty-printed
+    file per entry. Writes go to a temp file and are swapped in with os.replace,
+    so readers never see half-written JSON.
+    """
+
+    def __init__(self, root=JSON_FILES_DIR):
+        self.root = root
+
+    def path(self, namespace, key):
+        if not valid_key(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        return os.path.join(self.root, namespace, f"{key}.json")
+
+    def get(self, namespace, key):
+        try:
+            with open(self.path(namespace, key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, namespace, key, value):
+        path = self.path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def delete(self, namespace, key):
+        try:
+            os.remove(self.path(namespace, key))
+        except FileNotFoundError:
+            pass
+
+
+class SQLiteStore:
+    """
+    Single-file store: compact JSON, zlib-compressed, one row per (namespace, key).
+    Each put is one transaction, so a reader sees the old value or the new one.
+    Misses fall through to an optional FileStore and are imported, so the
+    existing json_files/ caches keep working after switching over.
+    """
+
+    def __init__(self, path, fallback=None, level=6):
+        self.path = path
+        self.fallback = fallback
+        self.level = level
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+
+    def _connect(self):
+        # One connection per thread, reopened in forked worker processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _encode(self, value):
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return zlib.compress(raw, self.level)
+
+    def get(self, namespace, key):
+        if not valid_key(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        row = self._connect().execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row:
+            return json.loads(zlib.decompress(row[0]))
+
+        if self.fallback is not None:
+            value = self.fallback.get(namespace, key)
+            if value is not None:
+                self.put(namespace, key, value)
+            return value
+        return None
+
+    def put(self, namespace, key, value):
+        if not valid_key(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        self._connect().execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, self._encode(value), time.time())
+        )
+
+    def delete(self, namespace, key):
+        self._connect().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        if self.fallback is not None:
+            self.fallback.delete(namespace, key)
+
+
+# CACHE_STORE=sqlite (default) keeps everything in json_files/cache.sqlite;
+# CACHE_STORE=file keeps the one-file-per-entry layout
+CACHE_STORE = os.getenv("CACHE_STORE", "sqlite")
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", os.path.join(JSON_FILES_DIR, "cache.sqlite"))
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_cache_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            if CACHE_STORE == "file":
+                _store = FileStore()
+            else:
+                _store = SQLiteStore(CACHE_DB_PATH, fallback=FileStore())
+            print(f"🗄️ Review cache store: {type(_store).__name__}")
+        return _store
@@ -0,0 +1,253 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Size-capped sentence-embedding cache shared between threads and processes.
+    - Vectors live in one fixed-size float32 memory-mapped file (capacity x dim),
+      so every process maps the same pages instead of holding its own copy.
+    - An SQLite index maps (embedding model, text hash) -> slot and tracks
+      last use; when full, the least recently used slots are reused.
+    - Reads take no lock: a parallel memmap tags each slot with its key, and a
+      vector only counts as a hit if the tag matches before and after the copy.
+      last_used is updated in batches rather than on every read.
+    """
+
+    TOUCH_FLUSH_SIZE = 256     # pending last_used updates before a batched write
+    TOUCH_FLUSH_SEC = 30
+
+    def __init__(self, directory, model_name, capacity=100_000):
+        os.makedirs(directory, exist_ok=True)
+        safe_model = model_name.replace("/", "_")
+        self.model_name = model_name
+        self.capacity = capacity
+        self.vectors_path = os.path.join(directory, f"{safe_model}.f32")
+        self.tags_path = os.path.join(directory, f"{safe_model}.tags")
+        self.index_path = os.path.join(directory, f"{safe_model}.index.sqlite")
+        self.dim = None
+        self.vectors = None
+        self.tags = None
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._map_lock = threading.Lock()
+        self._touch_lock = threading.Lock()
+        self._touched = {}   # key -> last read time, not yet written to the index
+        self._touched_at = time.time()
+
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER UNIQUE, last_used REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._load_dim(self._connect())
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def reset_connections(self):
+        """Drops inherited SQLite handles (call in a child process after fork)."""
+        self._local = threading.local()
+
+    def _open_vectors(self, dim):
+        with self._map_lock:
+            if self.vectors is not None:
+                return
+            if not os.path.exists(self.tags_path):
+                self._create_tags()
+            mode = "r+" if os.path.exists(self.vectors_path) else "w+"
+            self.tags = np.memmap(self.tags_path, dtype=np.uint64, mode="r+", shape=(self.capacity,))
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode=mode, shape=(self.capacity, dim))
+            self.dim = dim
+
+    def _create_tags(self):
+        """First run with slot tags: untagged slots could never be read, so start the index over."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not os.path.exists(self.tags_path):
+                tmp_path = f"{self.tags_path}.{os.getpid()}.tmp"
+                np.memmap(tmp_path, dtype=np.uint64, mode="w+", shape=(self.capacity,)).flush()
+                os.replace(tmp_path, self.tags_path)
+                conn.execute("DELETE FROM entries")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _key(self, text):
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _tag(key):
+        # Never 0, which marks a slot that is empty or being rewritten
+        return np.uint64(int(key[:16], 16) | 1)
+
+    def _load_dim(self, conn):
+        """Maps the vector file once any process has recorded the embedding size."""
+        row = conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        if row:
+            self._open_vectors(int(row[0]))
+
+    def get_many(self, texts):
+        """{index in texts: vector} for every text already cached."""
+        if not texts:
+            return {}
+        conn = self._connect()
+        if self.vectors is None:
+            self._load_dim(conn)
+        if self.vectors is None:
+            self.misses += len(texts)
+            return {}
+
+        keys = [self._key(t) for t in texts]
+        slots = {}
+        unique_keys = list(set(keys))
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            slots.update(conn.execute(f"SELECT key, slot FROM entries WHERE key IN ({marks})", chunk).fetchall())
+
+        # put_many clears a slot's tag before overwriting the vector and sets it after,
+        # so a copy bracketed by two matching tags was not torn by a concurrent writer
+        copies = {}
+        for key, slot in slots.items():
+            tag = self._tag(key)
+            if self.tags[slot] != tag:
+                continue
+            vector = np.array(self.vectors[slot])
+            if self.tags[slot] == tag:
+                copies[key] = vector
+        found = {i: copies[k] for i, k in enumerate(keys) if k in copies}
+
+        self._touch(copies)
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    def _touch(self, keys):
+        """Records reads for LRU; written to the index in batches, not per lookup."""
+        now = time.time()
+        with self._touch_lock:
+            self._touched.update(dict.fromkeys(keys, now))
+            due = self._touched and (
+                len(self._touched) >= self.TOUCH_FLUSH_SIZE or now - self._touched_at >= self.TOUCH_FLUSH_SEC
+            )
+        if due:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                self._flush_touched(conn)
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                print(f"⚠️ Embedding cache LRU update failed: {e}")
+
+    def _flush_touched(self, conn):
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+            self._touched_at = time.time()
+        # Rows evicted since the read simply match nothing
+        conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(t, k) for k, t in touched.items()])
+
+    def put_many(self, texts, vectors):
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.vectors is None:
+            self._open_vectors(vectors.shape[1])
+        if vectors.shape[1] != self.dim:
+            return
+
+        entries = dict(zip((self._key(t) for t in texts), vectors))
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")  # one writer at a time across processes
+        try:
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('dim', ?)", (str(self.dim),))
+            self._flush_touched(conn)  # so recent reads aren't picked for eviction
+            keys = list(entries)
+            existing = set()
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                existing.update(k for (k,) in conn.execute(f"SELECT key FROM entries WHERE key IN ({marks})", chunk))
+            new_keys = [k for k in entries if k not in existing][:self.capacity]
+            if not new_keys:
+                conn.execute("COMMIT")
+                return
+
+            # Rows are only deleted to hand their slot straight to a new entry,
+            # so occupied slots are always 0..used-1
+            used = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            free = list(range(used, min(self.capacity, used + len(new_keys))))
+
+            shortfall = len(new_keys) - len(free)
+            if shortfall > 0:
+                evicted = conn.execute(
+                    "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (shortfall,)
+                ).fetchall()
+                conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in evicted])
+                free.extend(slot for _, slot in evicted)
+
+            now = time.time()
+            for key, slot in zip(new_keys, free):
+                self.tags[slot] = 0
+                self.vectors[slot] = entries[key]
+                self.tags[slot] = self._tag(key)
+            self.vectors.flush()
+            self.tags.flush()
+            conn.executemany(
+                "INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                [(key, slot, now) for key, slot in zip(new_keys, free)]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / lookups, 3) if lookups else 0}
+
+
+class CachedEmbedder:
+    """
+    Wraps a KeyBERT embedding backend (anything with .embed(documents)) so that
+    only texts missing from the EmbeddingCache go through the model.
+    """
+
+    def __init__(self, backend, cache):
+        self.backend = backend
+        self.cache = cache
+
+    def __getattr__(self, name):
+        # Anything else (embedding_model, etc.) is served by the real backend
+        return getattr(self.backend, name)
+
+    def embed(self, documents, verbose=False):
+        documents = list(documents)
+        if not documents:
+            return self.backend.embed(documents, verbose=verbose)
+        found = self.cache.get_many(documents)
+
+        missing = list(dict.fromkeys(d for i, d in enumerate(documents) if i not in found))
+        computed = {}
+        if missing:
+            vectors = self.backend.embed(missing, verbose=verbose)
+            computed = dict(zip(missing, vectors))
+            try:
+                self.cache.put_many(missing, vectors)
+            except sqlite3.Error as e:
+                print(f"⚠️ Embedding cache write failed: {e}")
+
+        return np.array([found[i] if i in found else computed[d] for i, d in enumerate(documents)])
@@ -0,0 +1,72 @@
+import re
+
+
+def _trie_regex(terms):
+    """
+    Builds one regex alternation from a trie of the terms, so shared
+    prefixes ("game", "gaming", "gpu") are tested once per text position.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        children = sorted(k for k in node if k)
+        if not children:
+            return ""
+        alts = [re.escape(ch) + build(node[ch]) for ch in children]
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # A term ends here but longer ones continue: greedy optional prefers the longest
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Single-pass, word-boundary matcher for a {group: [keywords]} taxonomy.
+    match() returns a bitmap of groups (bit i = i-th group) plus the terms hit.
+    Plural forms ("games", "classes") also match.
+    """
+
+    def __init__(self, keywords_dict):
+        self.groups = list(keywords_dict.keys())
+        self.term_groups = {}
+        for bit, (group, terms) in enumerate(keywords_dict.items()):
+            for term in terms:
+                term = term.lower().strip()
+                if term:
+                    self.term_groups[term] = self.term_groups.get(term, 0) | (1 << bit)
+
+        self.pattern = re.compile(rf"\b({_trie_regex(self.term_groups)})(?:e?s)?\b")
+
+    def match(self, text):
+        hits = set(self.pattern.findall(text.lower()))
+        bitmap = 0
+        for term in hits:
+            bitmap |= self.term_groups[term]
+        return bitmap, hits
+
+    def match_all(self, texts):
+        """Bitmaps for every text, in order."""
+        return [self.match(text)[0] for text in texts]
+
+    def groups_in(self, bitmap):
+        return [group for bit, group in enumerate(self.groups) if bitmap & (1 << bit)]
+
+    def has_group(self, bitmap, group):
+        return bool(bitmap & (1 << self.groups.index(group)))
+
+
+_matchers = {}
+
+def get_matcher(keywords_dict):
+    """Compiled matchers are reused for as long as the taxonomy is unchanged."""
+    key = tuple((group, tuple(terms)) for group, terms in keywords_dict.items())
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = KeywordMatcher(keywords_dict)
+    return matcher
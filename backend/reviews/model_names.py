@@ -0,0 +1,84 @@
+import re
+
+# Series name -> brand, used to add a missing brand prefix ("IdeaPad Slim 5" -> "Lenovo IdeaPad Slim 5")
+SERIES_BRANDS = {
+    "ideapad": "Lenovo", "thinkpad": "Lenovo", "thinkbook": "Lenovo", "legion": "Lenovo",
+    "yoga": "Lenovo", "loq": "Lenovo",
+    "pavilion": "HP", "victus": "HP", "omen": "HP", "envy": "HP", "spectre": "HP", "elitebook": "HP",
+    "xps": "Dell", "inspiron": "Dell", "latitude": "Dell", "vostro": "Dell", "alienware": "Dell",
+    "zenbook": "ASUS", "vivobook": "ASUS", "rog": "ASUS", "tuf": "ASUS",
+    "aspire": "Acer", "nitro": "Acer", "predator": "Acer", "swift": "Acer",
+    "macbook": "Apple",
+}
+BRANDS = {"lenovo": "Lenovo", "hp": "HP", "dell": "Dell", "asus": "ASUS", "acer": "Acer", "apple": "Apple", "msi": "MSI"}
+
+# Canonical spelling of words the LLM writes in several ways
+WORD_CASING = {
+    "ideapad": "IdeaPad", "thinkpad": "ThinkPad", "thinkbook": "ThinkBook", "loq": "LOQ",
+    "xps": "XPS", "rog": "ROG", "tuf": "TUF", "zenbook": "Zenbook", "vivobook": "Vivobook",
+    "macbook": "MacBook", "elitebook": "EliteBook", "oled": "OLED",
+}
+
+# Different names for the same product line (lowercase canonical form -> canonical name)
+MODEL_ALIASES = {
+    "lenovo ideapad 5 pro": "Lenovo IdeaPad Pro 5",
+    "lenovo slim 7": "Lenovo Yoga Slim 7",
+    "lenovo slim 7 pro": "Lenovo Yoga Slim 7 Pro",
+    "lenovo slim 7 pro x": "Lenovo Yoga Slim 7 Pro X",
+    "lenovo legion 5i": "Lenovo Legion 5",
+    "lenovo legion 7i": "Lenovo Legion 7",
+}
+
+# Qualifiers that don't change which reviews are relevant
+_PARENTHESES = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_SCREEN_SIZE = re.compile(r"\b\d{2}(?:\.\d)?\s*(?:-\s*)?(?:inch(?:es)?|in\b|\"|”)", re.IGNORECASE)
+_GENERATION = re.compile(
+    r"\b(?:gen(?:eration)?\s*\.?\s*\d+|g\d+|\d+(?:st|nd|rd|th)\s+gen(?:eration)?)\s*$", re.IGNORECASE
+)
+_PUNCTUATION = re.compile(r"[_,;:|/\\™®©]+|(?<!\d)\.|\.(?!\d)")
+_FILLER_WORDS = {"laptop", "notebook", "series", "review", "reviews"}
+
+
+def _case_word(word):
+    lower = word.lower()
+    if lower in WORD_CASING:
+        return WORD_CASING[lower]
+    if lower in BRANDS:
+        return BRANDS[lower]
+    if word.isalpha():
+        return word.capitalize()
+    # Model codes ("x1", "14p", "P15v"): only the leading letter is normalized
+    return word[0].upper() + word[1:]
+
+
+def canonical_model_name(name):
+    """
+    One spelling per product line, so every variant the LLM produces shares
+    the same review caches:
+    "Lenovo Ideapad Slim 5 Gen 8", "IdeaPad Slim 5 (16-inch)", "IdeaPad_Slim_5_review"
+    -> "Lenovo IdeaPad Slim 5".
+    """
+    text = _PARENTHESES.sub(" ", name or "")
+    text = _SCREEN_SIZE.sub(" ", text)
+    text = _PUNCTUATION.sub(" ", text)
+    text = re.sub(r"\s+-\s+|\s+", " ", text).strip()
+
+    words = [w for w in text.split(" ") if w and w.lower() not in _FILLER_WORDS]
+    # Generation suffixes may be followed by fillers, so strip them after those are gone
+    text = _GENERATION.sub("", " ".join(words)).strip()
+    words = [_case_word(w) for w in text.split(" ") if w]
+    if not words:
+        return (name or "").strip()
+
+    if words[0].lower() not in BRANDS:
+        brand = next((SERIES_BRANDS[w.lower()] for w in words if w.lower() in SERIES_BRANDS), None)
+        if brand:
+            words.insert(0, brand)
+
+    canonical = " ".join(words)
+    return MODEL_ALIASES.get(canonical.lower(), canonical)
+
+
+def model_cache_key(name):
+    """File-name-safe cache key for a model (same underscore style as before canonicalization)."""
+    return canonical_model_name(name).replace(" ", "_")
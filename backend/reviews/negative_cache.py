@@ -0,0 +1,53 @@
+import os
+import random
+import time
+from .cache_store import get_cache_store, NS_NEGATIVE
+
+# First retry after an empty scrape comes after ~BASE, then doubles per attempt up to MAX
+NEGATIVE_BACKOFF_BASE_SEC = float(os.getenv("NEGATIVE_BACKOFF_BASE_SEC", 600))
+NEGATIVE_BACKOFF_MAX_SEC = float(os.getenv("NEGATIVE_BACKOFF_MAX_SEC", 7 * 86400))
+
+
+def backoff_delay(attempts, rng=random):
+    """Exponential backoff with "equal jitter": half the step is fixed, half random, so retries don't line up."""
+    step = min(NEGATIVE_BACKOFF_BASE_SEC * 2 ** (attempts - 1), NEGATIVE_BACKOFF_MAX_SEC)
+    return step / 2 + rng.uniform(0, step / 2)
+
+
+def _key(source, model_key):
+    return f"{source}_{model_key}"
+
+
+def retry_in(source, model_key):
+    """Seconds until `source` may be scraped again for this model (0 = go ahead)."""
+    record = get_cache_store().get(NS_NEGATIVE, _key(source, model_key))
+    if record is None:
+        return 0.0
+    return max(record["next_retry_at"] - time.time(), 0.0)
+
+
+def record_empty(source, model_key, reason="empty"):
+    """
+    Remembers a scrape that found nothing (or failed) and schedules the next try.
+    The record lives in the shared cache store, so every worker process backs off together.
+    """
+    store = get_cache_store()
+    key = _key(source, model_key)
+    now = time.time()
+    record = store.get(NS_NEGATIVE, key) or {"attempts": 0, "first_failed_at": now}
+    record["attempts"] += 1
+    record["last_failed_at"] = now
+    record["reason"] = reason
+    record["next_retry_at"] = now + backoff_delay(record["attempts"])
+    store.put(NS_NEGATIVE, key, record)
+    print(f"🚫 No {source} reviews for {model_key} ({reason}, attempt {record['attempts']}); "
+          f"next try in {round((record['next_retry_at'] - now) / 60, 1)} min")
+    return record
+
+
+def clear(source, model_key):
+    """A scrape found reviews: forget earlier failures."""
+    store = get_cache_store()
+    key = _key(source, model_key)
+    if store.get(NS_NEGATIVE, key) is not None:
+        store.delete(NS_NEGATIVE, key)
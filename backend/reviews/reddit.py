@@ -1,10 +1,15 @@
 # reddit.py
 import praw
-import json
 import os
+import time
+import asyncio
 from dotenv import load_dotenv
+from .cache_store import get_cache_store, NS_REDDIT_RAW
+from .model_names import model_cache_key
+from . import negative_cache
 dotenv_path = os.path.join(os.path.dirname(__file__), 'reviews.env')
 load_dotenv(dotenv_path)
+from .reddit_async import fetch_threads, thread_record  # reads REDDIT_API_BASE etc. from the env
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
@@ -19,6 +24,85 @@ reddit = praw.Reddit(
     user_agent=os.getenv('REDDIT_USER_AGENT')
 )
 
+# "async" fetches all comment trees concurrently (httpx); "praw" walks submissions one by one
+REDDIT_SCRAPER = os.getenv("REDDIT_SCRAPER", "async")
+# Cached threads are checked for new submissions/comments once they are this old
+REDDIT_REFRESH_HOURS = float(os.getenv("REDDIT_REFRESH_HOURS", 24))
+
+# Raw store layout (NS_REDDIT_RAW, one entry per model):
+# {
+#   "threads": [thread_record...],          # ids, created_utc, num_comments, text, [comment id, body]
+#   "untracked": [str...],                  # reviews kept from the old id-less list format
+#   "watermark": {"created_utc": newest submission seen, "refreshed_at": last scrape}
+# }
+
+
+def _scrape_with_praw(search_query, subreddit, limit):
+    threads = []
+    for submission in reddit.subreddit(subreddit).search(search_query, limit=limit):
+        # Get comments (shallow)
+        submission.comments.replace_more(limit=0)
+        comments = [[comment.id, comment.body] for comment in submission.comments.list()]
+        threads.append(thread_record({
+            "id": submission.id, "created_utc": submission.created_utc, "num_comments": submission.num_comments,
+            "title": submission.title, "selftext": submission.selftext,
+        }, comments))
+    return threads
+
+
+def _scrape_threads(search_query, subreddit, limit, known=None, since_utc=None):
+    if REDDIT_SCRAPER == "async":
+        try:
+            # Runs on a fetch_reviews worker thread, which has no event loop of its own
+            return asyncio.run(fetch_threads(search_query, subreddit, limit, known, since_utc))
+        except Exception as e:
+            print(f"⚠️ Async Reddit scrape failed ({e}); falling back to praw")
+    threads = _scrape_with_praw(search_query, subreddit, limit)
+    if known is not None:
+        # praw path re-reads every tree; keep only what changed, like the async path
+        threads = [t for t in threads if t["id"] not in known or t["num_comments"] > known[t["id"]]]
+    return threads
+
+
+def raw_reviews(doc):
+    """Flat review list (title + body, then comments, per thread) from a raw-store entry."""
+    if isinstance(doc, list):  # id-less format from before watermarks
+        return doc
+    reviews = list(doc.get("untracked", []))
+    for thread in doc["threads"]:
+        reviews.append(thread["text"])
+        reviews.extend(body for _, body in thread["comments"])
+    return reviews
+
+
+def merge_threads(doc, threads):
+    """Appends new threads and unseen comments to doc in place; returns how many reviews were added."""
+    by_id = {t["id"]: t for t in doc["threads"]}
+    added = 0
+    for thread in threads:
+        existing = by_id.get(thread["id"])
+        if existing is None:
+            doc["threads"].append(thread)
+            by_id[thread["id"]] = thread
+            added += 1 + len(thread["comments"])
+            continue
+        seen = {cid for cid, _ in existing["comments"]}
+        new_comments = [c for c in thread["comments"] if c[0] not in seen]
+        existing["comments"].extend(new_comments)
+        # A failed tree fetch reports 0, which never raises the count past comments we don't have
+        existing["num_comments"] = max(existing["num_comments"], thread["num_comments"])
+        added += len(new_comments)
+
+    doc["watermark"] = {
+        "created_utc": max([t["created_utc"] for t in doc["threads"]] or [0]),
+        "refreshed_at": time.time(),
+    }
+    return added
+
+
+def _from_legacy(reviews):
+    return {"threads": [], "untracked": list(reviews), "watermark": {"created_utc": 0, "refreshed_at": 0}}
+
 
 def scrape_reddit_reviews(model_name, subreddit="laptops", limit=50):
     # 1. Prepare Paths & Query
@@ -26,50 +110,70 @@ def scrape_reddit_reviews(model_name, subreddit="laptops", limit=50):
     if "review" not in search_query.lower():
         search_query += " review"
     
-    cache_dir = os.path.join(BASE_DIR, "reviews", "json_files", "reddit_raw_reviews")
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_path = os.path.join(cache_dir, f"{model_name.replace(' ', '_')}.json")
+    store = get_cache_store()
+    cache_key = model_cache_key(model_name)
 
-    # 2. CACHE CHECK LOGIC (The Fix)
-    if os.path.exists(cache_path):
-        with open(cache_path, "r", encoding="utf-8") as f:
-            try:
-                cached_reviews = json.load(f)
-            except json.JSONDecodeError:
-                cached_reviews = []
-        
-        # ONLY return if we actually have data. 
-        # If list is empty, ignore cache and try scraping again.
-        if cached_reviews and len(cached_reviews) > 0:
-            print(f"♻️ Loading cached Reddit reviews from: {cache_path}")
-            return cached_reviews
-        else:
+    # 2. CACHE CHECK LOGIC
+    cached = store.get(NS_REDDIT_RAW, cache_key)
+    if cached is not None:
+        doc = _from_legacy(cached) if isinstance(cached, list) else cached
+        reviews = raw_reviews(doc)
+
+        # If list is empty, ignore cache and try scraping again (once the backoff below allows it).
+        if not reviews:
             print(f"⚠️ Empty cache found for {model_name}. Re-scraping with query: '{search_query}'")
+        elif time.time() - doc["watermark"]["refreshed_at"] < REDDIT_REFRESH_HOURS * 3600:
+            print(f"♻️ Loading cached Reddit reviews for: {cache_key}")
+            return reviews
+        else:
+            # Incremental refresh: only new threads and threads with new comments are downloaded
+            known = {t["id"]: t["num_comments"] for t in doc["threads"]}
+            print(f"🔄 Refreshing Reddit reviews for {cache_key} since {doc['watermark']}")
+            try:
+                threads = _scrape_threads(
+                    search_query, subreddit, limit, known=known, since_utc=doc["watermark"]["created_utc"]
+                )
+            except Exception as e:
+                print(f"❌ Error refreshing from Reddit: {e}")
+                return reviews
+
+            added = merge_threads(doc, threads)
+            if doc["untracked"]:
+                # Old id-less reviews that came back as tracked threads are now stored there
+                tracked = set(raw_reviews({"threads": doc["threads"]}))
+                doc["untracked"] = [r for r in doc["untracked"] if r not in tracked]
+            store.put(NS_REDDIT_RAW, cache_key, doc)
+            print(f"💾 Added {added} new Reddit reviews for: {cache_key}")
+            return raw_reviews(doc)
+
+    # 3. SCRAPE (If cache was missing or empty), unless earlier empty scrapes put this model on backoff
+    wait = negative_cache.retry_in("reddit", cache_key)
+    if wait > 0:
+        print(f"⏳ Reddit had nothing for {cache_key}; not retrying for another {round(wait / 60, 1)} min")
+        return []
 
-    # 3. SCRAPE (If cache was missing or empty)
-    reviews = []
+    doc = {"threads": [], "untracked": []}
     print(f"🕵️ Reddit Search Query: '{search_query}'")
     
+    failure = None
     try:
-        for submission in reddit.subreddit(subreddit).search(search_query, limit=limit):
-            # Combine title and body
-            text = f"{submission.title} {submission.selftext}"
-            reviews.append(text)
-            
-            # Get comments (shallow)
-            submission.comments.replace_more(limit=0)
-            for comment in submission.comments.list():
-                reviews.append(comment.body)
+        merge_threads(doc, _scrape_threads(search_query, subreddit, limit))
     except Exception as e:
         print(f"❌ Error connecting to Reddit: {e}")
+        merge_threads(doc, [])
+        failure = "error"
 
-    # 4. SAVE (Even if empty, to update timestamp, but next time it will retry thanks to logic above)
-    with open(cache_path, "w", encoding="utf-8") as f:
-        json.dump(reviews, f, ensure_ascii=False, indent=2)
+    # 4. SAVE (Even if empty, to update timestamp; the negative cache decides when to retry)
+    store.put(NS_REDDIT_RAW, cache_key, doc)
+    reviews = raw_reviews(doc)
+    if reviews:
+        negative_cache.clear("reddit", cache_key)
+    else:
+        negative_cache.record_empty("reddit", cache_key, failure or "empty")
     
-    print(f"💾 Saved {len(reviews)} Reddit reviews to: {cache_path}")
+    print(f"💾 Saved {len(reviews)} Reddit reviews for: {cache_key}")
     return reviews
 
 if __name__ == "__main__":
     model_name = "IdeaPad Slim 3"
-    reviews = scrape_reddit_reviews(model_name)
\ No newline at end of file
+    reviews = scrape_reddit_reviews(model_name)
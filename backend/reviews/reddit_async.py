@@ -0,0 +1,230 @@
+import asyncio
+import os
+import time
+import httpx
+
+REDDIT_API_BASE = os.getenv("REDDIT_API_BASE", "https://oauth.reddit.com")
+REDDIT_AUTH_URL = os.getenv("REDDIT_AUTH_URL", "https://www.reddit.com/api/v1/access_token")
+REDDIT_CONCURRENCY = int(os.getenv("REDDIT_CONCURRENCY", 8))
+MAX_RETRIES = 3
+
+
+class RedditRateLimiter:
+    """
+    Tracks Reddit's X-Ratelimit-Remaining / X-Ratelimit-Reset headers and
+    makes callers wait for the next window instead of running into 429s.
+    Requests already in flight count against the remaining budget.
+    """
+
+    def __init__(self, reserve=1):
+        self.reserve = reserve
+        self.remaining = None     # unknown until the first response
+        self.reset_at = 0.0
+        self.in_flight = 0
+        self.waited_sec = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                if now >= self.reset_at and self.remaining is not None and self.in_flight == 0:
+                    self.remaining = None  # new window; the next response tells us its size
+                if self.remaining is None or self.remaining - self.in_flight > self.reserve:
+                    self.in_flight += 1
+                    return
+                delay = max(self.reset_at - now, 0.05)
+            self.waited_sec += delay
+            await asyncio.sleep(delay)
+
+    def release(self, headers=None):
+        self.in_flight -= 1
+        if headers is None:
+            return
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        now = time.monotonic()
+        if self.remaining is None or now >= self.reset_at:
+            self.remaining = float(remaining)
+            self.reset_at = now + float(reset)
+        else:
+            # Same window: responses can arrive out of order, so trust the lowest count seen
+            self.remaining = min(self.remaining, float(remaining))
+
+    def block_for(self, seconds):
+        """After a 429: nobody sends anything until Retry-After has passed."""
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, time.monotonic() + seconds)
+
+
+class AsyncRedditClient:
+    """
+    Minimal application-only Reddit API client on one pooled httpx connection pool.
+    At most `concurrency` requests are in flight; all of them share one rate limiter.
+    """
+
+    def __init__(self, client_id, client_secret, user_agent, concurrency=REDDIT_CONCURRENCY,
+                 api_base=REDDIT_API_BASE, auth_url=REDDIT_AUTH_URL, timeout=20):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.api_base = api_base.rstrip("/")
+        self.auth_url = auth_url
+        self.limiter = RedditRateLimiter()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.http = httpx.AsyncClient(
+            headers={"User-Agent": user_agent or "laptop-review-scraper"},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self._token = None
+        self._token_lock = asyncio.Lock()
+        self.requests = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.http.aclose()
+
+    async def _authorize(self):
+        async with self._token_lock:
+            if self._token is None:
+                response = await self.http.post(
+                    self.auth_url,
+                    data={"grant_type": "client_credentials"},
+                    auth=(self.client_id or "", self.client_secret or ""),
+                )
+                response.raise_for_status()
+                self._token = response.json()["access_token"]
+        return self._token
+
+    async def get(self, path, params=None):
+        params = {"raw_json": 1, **(params or {})}
+        for attempt in range(MAX_RETRIES + 1):
+            token = await self._authorize()
+            async with self.semaphore:
+                await self.limiter.acquire()
+                headers = None
+                try:
+                    response = await self.http.get(
+                        f"{self.api_base}{path}", params=params,
+                        headers={"Authorization": f"bearer {token}"}
+                    )
+                    headers = response.headers
+                    self.requests += 1
+                finally:
+                    self.limiter.release(headers)
+
+            if response.status_code == 429 and attempt < MAX_RETRIES:
+                retry_after = float(response.headers.get("retry-after") or response.headers.get("x-ratelimit-reset") or 2 ** attempt)
+                print(f"⏳ Reddit rate limit hit; retrying in {retry_after:.1f}s")
+                self.limiter.block_for(retry_after)
+                continue
+            if response.status_code == 401 and attempt < MAX_RETRIES:
+                self._token = None  # expired token
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    async def search(self, subreddit, query, limit=50, sort="relevance"):
+        listing = await self.get(f"/r/{subreddit}/search", {
+            "q": query, "restrict_sr": 1, "limit": limit, "sort": sort, "type": "link"
+        })
+        return [child["data"] for child in listing["data"]["children"] if child.get("kind") == "t3"]
+
+    async def comments(self, submission_id):
+        """All loaded comments of a submission as [id, body] pairs, breadth-first like praw's comments.list()."""
+        _, listing = await self.get(f"/comments/{submission_id}", {"limit": 500})
+        return flatten_comments(listing)
+
+
+def flatten_comments(listing):
+    """[id, body] for every comment of a listing, breadth-first; "more" stubs are dropped (replace_more(limit=0))."""
+    comments = []
+    queue = list(listing["data"]["children"])
+    while queue:
+        child = queue.pop(0)
+        if child.get("kind") != "t1":
+            continue
+        data = child["data"]
+        comments.append([data.get("id"), data.get("body", "")])
+        replies = data.get("replies")
+        if isinstance(replies, dict):
+            queue.extend(replies["data"]["children"])
+    return comments
+
+
+def thread_record(submission, comments):
+    """Raw-store shape of one scraped submission."""
+    return {
+        "id": submission["id"],
+        "created_utc": submission.get("created_utc", 0),
+        "num_comments": submission.get("num_comments", 0),
+        "text": f"{submission.get('title', '')} {submission.get('selftext', '')}",
+        "comments": comments,
+    }
+
+
+def _new_client():
+    return AsyncRedditClient(
+        os.getenv("REDDIT_CLIENT_ID"), os.getenv("REDDIT_CLIENT_SECRET"), os.getenv("REDDIT_USER_AGENT")
+    )
+
+
+async def fetch_threads(search_query, subreddit="laptops", limit=50, known=None, since_utc=None, client=None):
+    """
+    Scraped threads (see thread_record), comment trees fetched concurrently.
+
+    known={submission id: num_comments} makes this incremental: a tracked
+    thread's tree is only re-fetched when its comment count grew, and a
+    second sort=new search picks up threads created after since_utc that
+    the relevance ranking doesn't return. Unchanged threads are omitted.
+    """
+    own_client = client is None
+    client = client or _new_client()
+    try:
+        submissions = await client.search(subreddit, search_query, limit=limit)
+        if known is not None:
+            seen = {s["id"] for s in submissions}
+            newest = await client.search(subreddit, search_query, limit=limit, sort="new")
+            submissions += [
+                s for s in newest
+                # tracked threads outside the relevance top-N still get their counts checked
+                if s["id"] not in seen and (s.get("created_utc", 0) > (since_utc or 0) or s["id"] in known)
+            ]
+            submissions = [
+                s for s in submissions
+                if s["id"] not in known or s.get("num_comments", 0) > known[s["id"]]
+            ]
+
+        trees = await asyncio.gather(*(client.comments(s["id"]) for s in submissions), return_exceptions=True)
+
+        threads = []
+        for submission, comments in zip(submissions, trees):
+            if isinstance(comments, Exception):
+                print(f"⚠️ Failed to load comments for {submission.get('id')}: {comments}")
+                # Record none seen, so the next refresh sees a higher count and fetches the tree again
+                submission = {**submission, "num_comments": 0}
+                comments = []
+            threads.append(thread_record(submission, comments))
+        print(f"🌐 Reddit async scrape: {len(threads)} threads fetched, {client.requests} requests, "
+              f"{client.limiter.waited_sec:.1f}s rate-limit wait")
+        return threads
+    finally:
+        if own_client:
+            await client.http.aclose()
+
+
+async def scrape_reddit_reviews_async(search_query, subreddit="laptops", limit=50, client=None):
+    """
+    Same output as the praw scraper (each submission's title + body followed by
+    its comments, in search order), but all comment trees are fetched concurrently.
+    """
+    threads = await fetch_threads(search_query, subreddit, limit, client=client)
+    reviews = []
+    for thread in threads:
+        reviews.append(thread["text"])
+        reviews.extend(body for _, body in thread["comments"])
+    return reviews
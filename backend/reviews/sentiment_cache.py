@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class PersistentSentimentStore:
+    """
+    Size-capped {text hash: VADER scores} map shared across runs and processes,
+    backed by SQLite. New scores are buffered in memory and appended by flush()
+    in one transaction, so a flush costs what was added, not the whole store;
+    past max_entries the least recently used rows are dropped.
+    """
+
+    def __init__(self, path, max_entries=200_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._pending = {}      # key -> scores, not written yet
+        self._touched = set()   # keys read since the last flush (for LRU)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        # One connection per thread, reopened in forked worker processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _setup(self):
+        if self._ready:
+            return
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+        self._ready = True
+
+    def get(self, key):
+        with self._lock:
+            self._setup()
+            scores = self._pending.get(key)
+            if scores is not None:
+                return scores
+            row = self._connect().execute("SELECT value FROM scores WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._touched.add(key)
+            return json.loads(row[0])
+
+    def put(self, key, scores):
+        with self._lock:
+            self._setup()
+            self._pending[key] = scores
+
+    def flush(self):
+        with self._lock:
+            self._setup()
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending and not self._touched:
+            return
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO scores (key, value, last_used) VALUES (?, ?, ?)",
+                [(k, json.dumps(v, separators=(",", ":")), now) for k, v in self._pending.items()]
+            )
+            conn.executemany("UPDATE scores SET last_used = ? WHERE key = ?", [(now, k) for k in self._touched])
+            excess = conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used LIMIT ?)", (excess,)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._pending.clear()
+        self._touched.clear()
+
+    def stats(self):
+        with self._lock:
+            self._setup()
+            stored = self._connect().execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            return {"stored": stored, "pending": len(self._pending), "max_entries": self.max_entries}
+
+
+class SentimentCache:
+    """
+    Drop-in replacement for SentimentIntensityAnalyzer inside one analysis run:
+    every unique text is scored by VADER at most once, and optionally looked
+    up in / saved to a PersistentSentimentStore shared across runs.
+    """
+
+    def __init__(self, analyzer, store=None):
+        self.analyzer = analyzer
+        self.store = store
+        self.table = {}
+        self.vader_calls = 0
+        self.hits = 0
+
+    def polarity_scores(self, text):
+        key = text_key(text)
+        scores = self.table.get(key)
+        if scores is not None:
+            self.hits += 1
+            return scores
+
+        if self.store is not None:
+            scores = self.store.get(key)
+        if scores is None:
+            scores = self.analyzer.polarity_scores(text)
+            self.vader_calls += 1
+            if self.store is not None:
+                self.store.put(key, scores)
+        else:
+            self.hits += 1
+
+        self.table[key] = scores
+        return scores
+
+    def compound(self, text):
+        return self.polarity_scores(text)["compound"]
+
+    def stats(self):
+        return {"vader_calls": self.vader_calls, "cache_hits": self.hits, "unique_texts": len(self.table)}
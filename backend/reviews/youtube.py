@@ -1,10 +1,13 @@
 import os
-import json
 import re
+import time
 import concurrent.futures
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
-from youtube_comment_downloader import YoutubeCommentDownloader
+from youtube_comment_downloader import YoutubeCommentDownloader, SORT_BY_POPULAR
 from youtubesearchpython import VideosSearch
+from .cache_store import get_cache_store, NS_YOUTUBE_RAW
+from .model_names import model_cache_key
+from . import negative_cache
 
 MODEL_NAME = "IdeaPad Slim 3"
 NUM_VIDEOS = 3
@@ -12,10 +15,11 @@ import os
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
-# Ensure cache folder for all model reviews exists
-cache_dir = os.path.join(BASE_DIR, "reviews", "json_files", "youtube_raw_reviews")
+# Per-video limits on comment ingestion (comments arrive most-liked first, so the cut keeps the best ones)
+YOUTUBE_MAX_COMMENTS = int(os.getenv("YOUTUBE_MAX_COMMENTS", 300))
+YOUTUBE_MAX_COMMENT_BYTES = int(os.getenv("YOUTUBE_MAX_COMMENT_BYTES", 256 * 1024))
+YOUTUBE_COMMENT_DEADLINE_SEC = float(os.getenv("YOUTUBE_COMMENT_DEADLINE_SEC", 20))
 
-os.makedirs(cache_dir, exist_ok=True)
 
 def clean_text(text):
     text = re.sub(r"http\S+", "", text)
@@ -23,6 +27,45 @@ def clean_text(text):
     text = re.sub(r"\s+", " ", text)
     return text.strip()
 
+def take_comments(comments, max_comments=None, max_bytes=None, deadline_sec=None):
+    """
+    Cleans comments as the downloader yields them and stops at the first cap hit
+    (kept count, kept bytes, or wall-clock deadline). Returns (cleaned, stop reason).
+    The downloader pages lazily, so stopping here also stops the network requests;
+    the deadline is checked between comments, so a slow page can overrun it once.
+    """
+    max_comments = YOUTUBE_MAX_COMMENTS if max_comments is None else max_comments
+    max_bytes = YOUTUBE_MAX_COMMENT_BYTES if max_bytes is None else max_bytes
+    deadline_sec = YOUTUBE_COMMENT_DEADLINE_SEC if deadline_sec is None else deadline_sec
+
+    deadline = time.monotonic() + deadline_sec
+    cleaned, size = [], 0
+    stop = "exhausted"
+    try:
+        for comment in comments:
+            if time.monotonic() >= deadline:
+                stop = "deadline"
+                break
+            text = comment['text']
+            if len(text.strip()) <= 20:
+                continue
+            text = clean_text(text)
+            cleaned.append(text)
+            size += len(text.encode("utf-8"))
+            if len(cleaned) >= max_comments:
+                stop = "count"
+                break
+            if size >= max_bytes:
+                stop = "bytes"
+                break
+    except Exception as e:
+        # Keep what arrived before the failure
+        stop = f"error: {e}"
+    finally:
+        if hasattr(comments, "close"):
+            comments.close()  # ends the downloader's pagination
+    return cleaned, stop
+
 def fetch_video_data(video):
     vid = video["id"]
     video_title = video["title"]
@@ -60,47 +103,60 @@ def fetch_video_data(video):
     comments = []
     try:
         downloader = YoutubeCommentDownloader()
-        for comment in downloader.get_comments_from_url(f'https://www.youtube.com/watch?v={vid}', sort_by=0):
-            text = comment['text']
-            if len(text) > 10:
-                comments.append(text)
-        print(f"💬 {len(comments)} comments fetched for: {video_title}")
+        comments, stop = take_comments(downloader.get_comments_from_url(
+            f'https://www.youtube.com/watch?v={vid}', sort_by=SORT_BY_POPULAR
+        ))
+        print(f"💬 {len(comments)} comments fetched for: {video_title} (stopped: {stop})")
     except Exception as e:
         print(f"⚠️ Error fetching comments for {video_title}: {e}")
 
-    combined_texts = [transcript_text] if transcript_text else []
-    combined_texts.extend(comments)
-    cleaned = [clean_text(r) for r in combined_texts if len(r.strip()) > 20]
+    # Comments are already cleaned and filtered
+    cleaned = [clean_text(transcript_text)] if len(transcript_text.strip()) > 20 else []
+    cleaned.extend(comments)
 
     return cleaned
 
 def scrape_youtube_reviews(model_name, num_videos=3):
-    # Cache path for entire model's combined reviews
-    cache_filepath = os.path.join(cache_dir, f"{model_name.replace(' ', '_')}.json")
+    # Cache key for entire model's combined reviews
+    store = get_cache_store()
+    cache_key = model_cache_key(model_name)
 
     if "review" not in model_name.lower():
         model_name += " review"
     
     # Check if cached combined reviews exist
-    if os.path.exists(cache_filepath):
+    cached_reviews = store.get(NS_YOUTUBE_RAW, cache_key)
+    if cached_reviews:
         print(f"♻️ Loading cached combined reviews for model: {model_name}")
-        with open(cache_filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return cached_reviews
 
-    videos_search = VideosSearch(model_name, limit=num_videos)
-    results = videos_search.result()["result"]
+    # Empty or missing: only search again once the backoff for this model has passed
+    wait = negative_cache.retry_in("youtube", cache_key)
+    if wait > 0:
+        print(f"⏳ YouTube had nothing for {cache_key}; not retrying for another {round(wait / 60, 1)} min")
+        return []
 
     all_reviews = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_videos) as executor:
-        results_list = list(executor.map(fetch_video_data, results))
-    for video_reviews in results_list:
-        all_reviews.extend(video_reviews)
+    failure = None
+    try:
+        videos_search = VideosSearch(model_name, limit=num_videos)
+        results = videos_search.result()["result"]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_videos) as executor:
+            results_list = list(executor.map(fetch_video_data, results))
+        for video_reviews in results_list:
+            all_reviews.extend(video_reviews)
+    except Exception as e:
+        print(f"❌ Error searching YouTube: {e}")
+        failure = "error"
 
     # Save combined reviews into one JSON per model
-    with open(cache_filepath, "w", encoding="utf-8") as f:
-        json.dump(all_reviews, f, ensure_ascii=False, indent=2)
-    # print(f"💾 Saved combined reviews for {model_name} to {cache_filepath}")
+    store.put(NS_YOUTUBE_RAW, cache_key, all_reviews)
     print(f"💾 Saved combined reviews for {model_name}")
+    if all_reviews:
+        negative_cache.clear("youtube", cache_key)
+    else:
+        negative_cache.record_empty("youtube", cache_key, failure or "empty")
 
 
     return all_reviews
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { useParams } from 'react-router-dom';
 import { Link } from 'react-router-dom';
 import "./ProductInfo.css"
@@ -7,6 +7,8 @@ import ReviewSection from './ReviewSection.jsx';
 
 // import './ProductInfo.css';
 
+const API_BASE_URL = "https://mini-project-zhpn.onrender.com";
+
 // Define the keys that might be considered "More Info" (excluding the ones already shown in the card body if desired)
 const DETAIL_KEYS = [
     "model",
@@ -30,7 +32,7 @@ function ProductInfo({ user, laptops }) {
 
   // / 🚨 CRITICAL FIX: Ensure both sides are strings for comparison.
   // We assume the ObjectId object is stored under the key '_id'.
-  const item = laptops.find(laptop => {
+  const listItem = laptops.find(laptop => {
       // 1. Check if the _id field exists.
       if (laptop._id) {
           // 2. Convert the ObjectId object to its string representation 
@@ -41,6 +43,25 @@ function ProductInfo({ user, laptops }) {
       return false;
   });
 
+  // List payloads only carry card fields; Why_in / what_it_says are loaded here on demand
+  const [details, setDetails] = useState(null);
+
+  useEffect(() => {
+    if (!listItem?.model) return;
+    let isMounted = true;
+
+    fetch(`${API_BASE_URL}/laptops/${encodeURIComponent(listItem.model)}`)
+      .then(res => (res.ok ? res.json() : null))
+      .then(data => {
+        if (isMounted && data) setDetails(data);
+      })
+      .catch(err => console.error("Error fetching laptop details:", err));
+
+    return () => { isMounted = false; };
+  }, [listItem?.model]);
+
+  const item = listItem && details ? { ...listItem, ...details } : listItem;
+
   if (!item) {
     return (
         <div className="product-info-details">
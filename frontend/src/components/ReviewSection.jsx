@@ -7,7 +7,6 @@ import { MessageSquare, ThumbsUp, ThumbsDown, Loader2 } from "lucide-react";
 function ReviewSection({ model }) {
   const [reviewAnalysis, setReviewAnalysis] = useState(null);
   const [loading, setLoading] = useState(true);
-  const [retryCount, setRetryCount] = useState(0);
   const [selectedGroup, setSelectedGroup] = useState("Gamers");
 
   useEffect(() => {
@@ -18,32 +17,43 @@ function ReviewSection({ model }) {
 
     let isMounted = true;
 
-    const fetchData = () => {
-      fetch(fetchUrl)
+    const fetchData = (url) => {
+      fetch(url)
         .then(res => {
-          if (res.status === 404) throw new Error("File not found");
-          if (!res.ok) throw new Error("Network response not ok");
-          return res.json();
-        })
-        .then(data => {
-          if (isMounted) {
-            setReviewAnalysis(data);
-            setLoading(false);
+          if (!isMounted) return;
+          // 202: analysis is queued/running -> long-poll until the file is written
+          if (res.status === 202) return fetchData(`${fetchUrl}/wait`);
+          // 503: analysis queue is full -> back off before asking again
+          if (res.status === 503) {
+            setTimeout(() => isMounted && fetchData(fetchUrl), 10000);
+            return;
           }
+          if (!res.ok) throw new Error("Network response not ok");
+          return res.json().then(data => {
+            if (isMounted) {
+              setReviewAnalysis(data);
+              setLoading(false);
+              // Early tier (stats / snippets): render it and wait for the next one,
+              // unless a later tier failed (the server serves this one as final for now)
+              if (data.completeness && data.completeness !== "full" && !data.failure) {
+                fetchData(`${fetchUrl}/wait?after=${data.completeness}`);
+              }
+            }
+          });
         })
         .catch(err => {
-          console.error("Fetch error or file not ready:", err);
+          console.error("Fetch error while loading analysis:", err);
           if (isMounted) {
-            setTimeout(() => setRetryCount(prev => prev + 1), 3000);
+            setTimeout(() => isMounted && fetchData(fetchUrl), 5000);
           }
         });
     };
 
     setLoading(true);
-    fetchData();
+    fetchData(fetchUrl);
 
     return () => { isMounted = false; };
-  }, [model, retryCount]);
+  }, [model]);
 
   // Transform data logic
   const sentimentData = reviewAnalysis
@@ -55,8 +65,15 @@ function ReviewSection({ model }) {
       }))
     : [];
 
-  const currentGroupKeywords = reviewAnalysis?.group_analysis?.keywords_by_group[selectedGroup];
-  const currentGroupSnippets = reviewAnalysis?.group_analysis?.snippets_by_group[selectedGroup];
+  const currentGroupKeywords = reviewAnalysis?.group_analysis?.keywords_by_group?.[selectedGroup];
+  const currentGroupSnippets = reviewAnalysis?.group_analysis?.snippets_by_group?.[selectedGroup];
+  // Later tiers still being computed (older files have no completeness field);
+  // after a failed tier, whatever is missing is unavailable rather than pending
+  const tierFailed = Boolean(reviewAnalysis?.failure);
+  const keywordsMissing = reviewAnalysis && !reviewAnalysis.group_analysis.keywords_by_group;
+  const snippetsMissing = reviewAnalysis && !reviewAnalysis.group_analysis.snippets_by_group;
+  const keywordsPending = keywordsMissing && !tierFailed;
+  const snippetsPending = snippetsMissing && !tierFailed;
 
   // --- RENDER ---
   return (
@@ -109,7 +126,15 @@ function ReviewSection({ model }) {
             <div className="details-card">
               <h4>Top Pros & Cons for {selectedGroup}</h4>
               <div style={{ width: "100%", height: "350px" }}>
-                <ProsConsChart keywordsData={currentGroupKeywords} />
+                {keywordsPending ? (
+                  <div className="review-loader-container">
+                    <div className="review-loader"></div>
+                  </div>
+                ) : keywordsMissing ? (
+                  <p style={{ textAlign: 'center', padding: '20px' }}>Pros & cons are unavailable right now.</p>
+                ) : (
+                  <ProsConsChart keywordsData={currentGroupKeywords} />
+                )}
               </div>
             </div>
 
@@ -117,11 +142,11 @@ function ReviewSection({ model }) {
               <h4>What they are actually saying...</h4>
               <div className="snippet-box positive">
                 <div className="snippet-header"><ThumbsUp size={16} /> Positive</div>
-                <p>"{currentGroupSnippets?.positive[0] || "No specific data."}"</p>
+                <p>{snippetsPending ? "Loading..." : `"${currentGroupSnippets?.positive?.[0] || "No specific data."}"`}</p>
               </div>
               <div className="snippet-box negative">
                 <div className="snippet-header"><ThumbsDown size={16} /> Negative</div>
-                <p>"{currentGroupSnippets?.negative[0] || "No major complaints found."}"</p>
+                <p>{snippetsPending ? "Loading..." : `"${currentGroupSnippets?.negative?.[0] || "No major complaints found."}"`}</p>
               </div>
             </div>
           </div>
@@ -0,0 +1,113 @@
+"""
+Round-trip / latency benchmark for db_mongo.store_laptop_recommendations.
+
+Runs against a local mongod (MONGO_URI, default mongodb://localhost:27017)
+in a throwaway database and compares the old per-item implementation
+(find_one x2 + update_one per laptop) with the current bulk version.
+
+Usage:
+    python tests/bench_store_recommendations.py [iterations]
+"""
+import os
+import sys
+import time
+import statistics
+from pymongo import monitoring
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench_store_recommendations")
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+sys.path.insert(0, BACKEND_DIR)
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# Must be registered before db_mongo creates its MongoClient
+counter = CommandCounter()
+monitoring.register(counter)
+
+import db_mongo  # noqa: E402
+from reviews.model_names import canonical_model_name  # noqa: E402
+from bson import ObjectId  # noqa: E402
+
+# Names are already canonical (reviews.model_names), so the legacy and bulk paths look up the same documents
+ITEMS = [
+    {"model": "Lenovo Legion Slim 5", "price_inr": "₹1,35,000", "why": "Strong CPU and GPU for gaming."},
+    {"model": "Lenovo Yoga Slim 7 Pro", "price_inr": "₹1,30,000", "why": "Premium display and smooth performance."},
+    {"model": "Lenovo ThinkBook 16p", "price_inr": "₹1,40,000", "why": "Powerful specs for professionals."},
+    {"model": "Lenovo IdeaPad Pro 5", "price_inr": "₹1,32,000", "why": "Balanced performance and display."},
+    {"model": "Lenovo Legion 5 Pro", "price_inr": "₹1,38,000", "why": "Excels at gaming and video editing."},
+]
+QUERY_STR = "use_case: For gaming or watching high-quality videos ; budget: Above ₹1,30,000 (Premium laptops)"
+
+
+def legacy_store(request_id, items, query_str, user_id=None):
+    """The pre-bulk implementation, kept here only for comparison."""
+    item_map = {}
+    for item in items:
+        doc = item.copy()
+        item_map[doc["model"]] = doc
+        db_mongo.laptops_collection.find_one({"model": doc["model"]})
+
+    for model, doc in item_map.items():
+        existing = db_mongo.laptops_collection.find_one({"model": model})
+        doc["images"] = existing.get("images", []) if existing else []
+        doc["request_id"] = request_id
+        db_mongo.laptops_collection.update_one({"model": model}, {"$set": doc}, upsert=True)
+
+    if user_id:
+        form_input = db_mongo.parse_query_str(query_str)
+        db_mongo.users_collection.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$push": {"recommended": {"$each": [{"model": m, "form_input": form_input} for m in item_map]}}},
+            upsert=True
+        )
+
+
+def seed():
+    # Models already have their details, so no background Gemini fetch is queued
+    db_mongo.laptops_collection.delete_many({})
+    db_mongo.users_collection.delete_many({})
+    for item in ITEMS:
+        db_mongo.laptops_collection.insert_one({
+            **item, "model": canonical_model_name(item["model"]),
+            "details_status": db_mongo.DETAILS_READY, "images": [],
+        })
+
+
+def run(label, fn, iterations, user_id):
+    latencies = []
+    start_count = counter.count
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn("bench-request", ITEMS, QUERY_STR, user_id=user_id)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    round_trips = (counter.count - start_count) / iterations
+    print(f"{label:<8} round trips/call: {round_trips:5.1f}   "
+          f"p50: {statistics.median(latencies):7.2f} ms   "
+          f"max: {max(latencies):7.2f} ms")
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    user_id = str(ObjectId())
+
+    seed()
+    run("legacy", legacy_store, iterations, user_id)
+    seed()
+    run("bulk", db_mongo.store_laptop_recommendations, iterations, user_id)
+
+    db_mongo.client.drop_database(os.environ["DB_NAME"])
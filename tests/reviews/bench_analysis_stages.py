@@ -0,0 +1,223 @@
+"""
+Per-stage benchmark of reviews/analysis.py on fixed synthetic corpora
+(tests/reviews/synthetic_corpus.py), with a JSON baseline and a regression gate.
+
+Stages, timed separately (best of --repeats):
+    clean     clean_text over the raw reviews
+    classify  keyword matcher -> user groups
+    vader     platform stats + per-group sentiment (fresh SentimentCache per run)
+    snippets  sentence split/scoring and snippet selection per group
+    keybert   batched keyword extraction + filtering per group/polarity
+Each corpus size runs in its own subprocess so peak RSS is measured per size.
+
+Usage:
+    python tests/reviews/bench_analysis_stages.py run [--sizes 50 500 5000 50000] [--repeats 3] [--out FILE]
+    python tests/reviews/bench_analysis_stages.py compare BASELINE CURRENT [--threshold 0.2] [--min-delta-ms 5]
+
+`run` writes tests/reviews/benchmarks/latest.json by default; copy it to
+benchmarks/baseline.json on the reference machine to set the baseline.
+`compare` exits 1 if any stage (or peak RSS) is more than --threshold slower
+than the baseline, ignoring differences under --min-delta-ms.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+DEFAULT_SIZES = [50, 500, 5000, 50000]
+STAGES = ["clean", "classify", "vader", "snippets", "keybert"]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def bench_size(size, repeats):
+    """Runs inside the per-size subprocess; returns this size's result dict."""
+    # Cross-run caches would turn repeats into cache hits
+    os.environ["EMBEDDING_CACHE_CAPACITY"] = "0"
+    os.environ["SENTIMENT_CACHE_PATH"] = ""  # disabled
+    sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)), BACKEND_DIR]
+
+    from synthetic_corpus import make_corpus, corpus_checksum
+    from reviews import analysis
+    from reviews.sentiment_cache import SentimentCache
+
+    reviews = make_corpus(size)
+    rss_start = peak_rss_mb()
+
+    def stage_clean():
+        return [analysis.clean_text(r) for r in reviews if len(r.strip()) > 20]
+
+    def stage_classify(clean):
+        memberships = analysis.get_matcher(analysis.user_keywords).match_all(clean)
+        return analysis.classify_reviews_by_user(clean, analysis.user_keywords, memberships)
+
+    def stage_vader(groups):
+        scorer = SentimentCache(analysis.sia)
+        analysis.analyze_sentiment_stats(reviews, scorer)
+        return {user: analysis.analyze_sentiment_detailed(groups.get(user, []), scorer)[1]
+                for user in analysis.user_keywords}
+
+    def stage_snippets(groups):
+        scorer = SentimentCache(analysis.sia)
+        review_sentences, snippets = {}, {}
+        for user in analysis.user_keywords:
+            scored = []
+            for review in groups.get(user, []):
+                if review not in review_sentences:
+                    review_sentences[review] = analysis.score_review_sentences(review, scorer)
+                scored.extend(review_sentences[review])
+            scored.sort(key=lambda x: x[0], reverse=True)
+            snippets[user] = [s[1] for s in scored if s[0] > 0.6][:3]
+        return snippets
+
+    def stage_keybert(per_review):
+        docs, seeds, polarity = [], [], []
+        for user, rows in per_review.items():
+            for label, seed in (("positive", analysis.tech_concepts), ("negative", analysis.GENERIC_SEEDS)):
+                texts = [r["text"] for r in rows if r["label"] == label]
+                if texts:
+                    docs.append(" ".join(texts))
+                    seeds.append(seed)
+                    polarity.append(label)
+        scorer = SentimentCache(analysis.sia)
+        candidates = analysis.extract_keywords_batch(analysis.kw_model, docs, seeds)
+        return [analysis.filter_keywords(c, is_positive_bucket=(p == "positive"), scorer=scorer)
+                for c, p in zip(candidates, polarity)]
+
+    def timed(fn, *args):
+        best, result = None, None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = fn(*args)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best * 1000, 2), result
+
+    stages = {}
+    stages["clean"], clean = timed(stage_clean)
+    stages["classify"], groups = timed(stage_classify, clean)
+    stages["vader"], per_review = timed(stage_vader, groups)
+    stages["snippets"], _ = timed(stage_snippets, groups)
+    stages["keybert"], _ = timed(stage_keybert, per_review)
+
+    return {
+        "reviews": size,
+        "corpus_checksum": corpus_checksum(reviews),
+        "repeats": repeats,
+        "stages_ms": stages,
+        "total_ms": round(sum(stages.values()), 2),
+        "rss_before_mb": rss_start,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=TESTS_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(args):
+    results = {}
+    for size in args.sizes:
+        print(f"⏱️ Benchmarking {size} reviews...")
+        proc = subprocess.run(
+            [sys.executable, __file__, "_worker", str(size), str(args.repeats)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            sys.exit(f"❌ Benchmark for {size} reviews failed:\n{proc.stderr}")
+        # Library prints go to stdout too; the result is the last line
+        results[str(size)] = json.loads(proc.stdout.strip().splitlines()[-1])
+        r = results[str(size)]
+        print("   " + "  ".join(f"{s} {r['stages_ms'][s]:.1f}ms" for s in STAGES) + f"  peak {r['peak_rss_mb']}MB")
+
+    report = {
+        "meta": {
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results written to {args.out}")
+
+
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+
+    failures = []
+    print(f"{'size':>6} {'metric':<10} {'baseline':>10} {'current':>10} {'change':>8}")
+    for size, base in baseline.items():
+        cur = current.get(size)
+        if cur is None:
+            continue
+        if cur["corpus_checksum"] != base["corpus_checksum"]:
+            failures.append(f"{size}: corpus changed ({base['corpus_checksum']} -> {cur['corpus_checksum']})")
+            continue
+
+        rows = [(stage, base["stages_ms"][stage], cur["stages_ms"].get(stage), args.min_delta_ms) for stage in STAGES]
+        rows.append(("peak_rss", base["peak_rss_mb"], cur["peak_rss_mb"], args.min_delta_rss_mb))
+        for metric, old, new, min_delta in rows:
+            if new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            regressed = change > args.threshold and (new - old) > min_delta
+            flag = "  ❌" if regressed else ""
+            print(f"{size:>6} {metric:<10} {old:>10.1f} {new:>10.1f} {change:>+7.0%}{flag}")
+            if regressed:
+                failures.append(f"{size} reviews / {metric}: {old:.1f} -> {new:.1f} ({change:+.0%})")
+
+    if failures:
+        print("\n❌ Regressions past the threshold:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("\n✅ No stage regressed past the threshold.")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "_worker":
+        print(json.dumps(bench_size(int(sys.argv[2]), int(sys.argv[3]))))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="benchmark every corpus size and write a results JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument("--out", default=os.path.join(BENCH_DIR, "latest.json"))
+
+    compare_parser = sub.add_parser("compare", help="fail if CURRENT regressed against BASELINE")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore smaller absolute changes")
+    compare_parser.add_argument("--min-delta-rss-mb", type=float, default=20.0)
+
+    args = parser.parse_args()
+    run(args) if args.command == "run" else compare(args)
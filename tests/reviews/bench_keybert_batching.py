@@ -0,0 +1,75 @@
+"""
+Per-model KeyBERT timing: one extract_keywords call per group/polarity
+(the old behaviour, up to 10 calls) vs. a single extract_keywords_batch.
+
+Uses the locust mock corpus (analysis_with_cache.scrape_reddit_reviews_mock)
+for each model name given on the command line.
+
+Usage:
+    python tests/reviews/bench_keybert_batching.py ["Lenovo Legion 5" ...]
+"""
+import asyncio
+import os
+import sys
+import time
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+sys.path[:0] = [TESTS_DIR, BACKEND_DIR]
+
+from reviews import analysis_with_cache as mock  # noqa: E402
+from reviews import analysis  # noqa: E402
+
+
+def group_documents(reviews):
+    """(docs, seed_lists) exactly as analyze_unified_groups builds them."""
+    clean_reviews = [analysis.clean_text(r) for r in reviews if len(r.strip()) > 20]
+    categorized = analysis.classify_reviews_by_user(clean_reviews, analysis.user_keywords)
+    docs, seed_lists = [], []
+    for user_reviews in categorized.values():
+        _, per_review = analysis.analyze_sentiment_detailed(user_reviews, analysis.sia)
+        for label, seeds in (("positive", analysis.tech_concepts), ("negative", analysis.GENERIC_SEEDS)):
+            texts = [r["text"] for r in per_review if r["label"] == label]
+            if texts:
+                docs.append(" ".join(texts))
+                seed_lists.append(seeds)
+    return docs, seed_lists
+
+
+def per_group_calls(docs, seed_lists):
+    return [
+        analysis.kw_model.extract_keywords(
+            doc, seed_keywords=seeds,
+            **analysis.KEYBERT_VECTORIZER_PARAMS, **analysis.KEYBERT_MMR_PARAMS
+        )
+        for doc, seeds in zip(docs, seed_lists)
+    ]
+
+
+def batched_call(docs, seed_lists):
+    return analysis.extract_keywords_batch(analysis.kw_model, docs, seed_lists)
+
+
+def best_of(fn, *args, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    models = sys.argv[1:] or ["Lenovo IdeaPad Slim 5", "Lenovo Legion 5", "Lenovo Yoga Slim 7i"]
+
+    print(f"{'model':<28} {'docs':>4} {'per-group (s)':>14} {'batched (s)':>12} {'speedup':>8} {'top-1 agree':>12}")
+    for model_name in models:
+        reviews = asyncio.run(mock.scrape_reddit_reviews_mock(model_name))
+        docs, seed_lists = group_documents(reviews)
+
+        old_sec, old_kw = best_of(per_group_calls, docs, seed_lists)
+        new_sec, new_kw = best_of(batched_call, docs, seed_lists)
+
+        agree = sum(1 for a, b in zip(old_kw, new_kw) if a and b and a[0][0] == b[0][0])
+        print(f"{model_name:<28} {len(docs):>4} {old_sec:>14.3f} {new_sec:>12.3f} "
+              f"{old_sec / new_sec:>7.1f}x {agree:>6}/{len(docs)}")
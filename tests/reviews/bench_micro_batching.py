@@ -0,0 +1,65 @@
+"""
+Embedding throughput under concurrent load: N threads each embedding small
+lists of review sentences, calling the sentence-transformer directly vs.
+through MicroBatcher at a few batch-size / wait-window settings.
+
+Sentences come from the locust mock corpus (analysis_with_cache.scrape_reddit_reviews_mock).
+
+Usage:
+    python tests/reviews/bench_micro_batching.py [threads] [calls_per_thread]
+"""
+import asyncio
+import concurrent.futures
+import os
+import sys
+import time
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+sys.path[:0] = [TESTS_DIR, BACKEND_DIR]
+os.environ["EMBEDDING_CACHE_CAPACITY"] = "0"
+
+from nltk.tokenize import sent_tokenize  # noqa: E402
+from reviews import analysis_with_cache as mock  # noqa: E402
+from reviews import analysis  # noqa: E402
+from reviews.batching import MicroBatcher  # noqa: E402
+
+SETTINGS = [(32, 2), (64, 5), (128, 10)]  # (max_batch_size, max_wait_ms)
+
+
+def load_sentences():
+    reviews = asyncio.run(mock.scrape_reddit_reviews_mock("Lenovo Legion 5"))
+    return [s for r in reviews for s in sent_tokenize(analysis.clean_text(r)) if len(s) > 20]
+
+
+def run(embedder, sentences, threads, calls, chunk=4):
+    def worker(t):
+        for c in range(calls):
+            start = ((t * calls + c) * chunk) % max(1, len(sentences) - chunk)
+            embedder.embed(sentences[start:start + chunk])
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    elapsed = time.perf_counter() - start
+    return threads * calls * chunk / elapsed
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sentences = load_sentences()
+    raw_backend = analysis.embedding_batcher.backend if analysis.embedding_batcher else analysis.kw_model.model
+    raw_backend.embed(sentences[:8])  # warm-up
+
+    print(f"{threads} threads x {calls} calls x 4 sentences\n")
+    print(f"{'mode':<22} {'texts/s':>9} {'avg batch':>10} {'avg wait (ms)':>14}")
+    direct = run(raw_backend, sentences, threads, calls)
+    print(f"{'direct':<22} {direct:>9.0f} {'-':>10} {'-':>14}")
+
+    for batch_size, wait_ms in SETTINGS:
+        batcher = MicroBatcher(raw_backend, max_batch_size=batch_size, max_wait_ms=wait_ms)
+        rate = run(batcher, sentences, threads, calls)
+        m = batcher.metrics()
+        print(f"{f'batched {batch_size}/{wait_ms}ms':<22} {rate:>9.0f} "
+              f"{m['avg_batch_texts']:>10} {m['avg_queue_wait_ms']:>14}")
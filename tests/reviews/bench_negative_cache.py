@@ -0,0 +1,98 @@
+"""
+Negative caching of empty scrapes (reviews/negative_cache.py) against the local
+Reddit stub, serving a search with no results:
+
+1. the first scrape finds nothing and schedules a retry
+2. a burst of lookups from several worker processes (like the 3s UI polling
+   across gunicorn workers) costs no requests until the retry is due
+3. each further empty retry roughly doubles the wait (with jitter)
+4. once the search has results, the next due retry stores them and clears the record
+
+Usage:
+    python tests/reviews/bench_negative_cache.py [base_backoff_sec]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)), BACKEND_DIR]
+
+from reddit_stub_server import start_stub, synthesize_fixture  # noqa: E402
+
+BASE_SEC = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+fixture = synthesize_fixture(n_submissions=0)
+server, state, base_url = start_stub(fixture)
+
+# Must be set before the reviews modules read them
+tmp = tempfile.mkdtemp(prefix="negative_cache_")
+os.environ.update({
+    "REDDIT_API_BASE": base_url,
+    "REDDIT_AUTH_URL": f"{base_url}/api/v1/access_token",
+    "REDDIT_CLIENT_ID": os.getenv("REDDIT_CLIENT_ID") or "stub",
+    "REDDIT_CLIENT_SECRET": os.getenv("REDDIT_CLIENT_SECRET") or "stub",
+    "REDDIT_USER_AGENT": "bench",
+    "REDDIT_SCRAPER": "async",
+    "CACHE_STORE": "sqlite",
+    "CACHE_DB_PATH": os.path.join(tmp, "cache.sqlite"),
+    "NEGATIVE_BACKOFF_BASE_SEC": str(BASE_SEC),
+})
+
+from reviews import negative_cache  # noqa: E402
+from reviews.cache_store import NS_NEGATIVE, get_cache_store  # noqa: E402
+from reviews.model_names import model_cache_key  # noqa: E402
+from reviews.reddit import scrape_reddit_reviews  # noqa: E402
+
+MODEL = "Stub Obscure Laptop 13"
+KEY = model_cache_key(MODEL)
+
+
+def lookup(_):
+    return len(scrape_reddit_reviews(MODEL))
+
+
+def record():
+    return get_cache_store().get(NS_NEGATIVE, f"reddit_{KEY}")
+
+
+if __name__ == "__main__":
+    print("backoff steps (attempt: seconds):",
+          ", ".join(f"{n}: {negative_cache.backoff_delay(n):.1f}" for n in range(1, 7)))
+
+    before = state.requests
+    lookup(0)
+    assert state.requests - before == 1 and record()["attempts"] == 1
+    print(f"\nfirst empty scrape: 1 request, retry in {negative_cache.retry_in('reddit', KEY):.1f}s")
+
+    # Burst from 4 processes sharing the SQLite store: all answered from the negative cache
+    before = state.requests
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        results = pool.map(lookup, range(40))
+    assert sum(results) == 0
+    print(f"40 lookups from 4 processes during backoff: {state.requests - before} requests")
+    assert state.requests == before, "lookups during backoff reached Reddit"
+
+    waits = []
+    for attempt in (2, 3):
+        time.sleep(negative_cache.retry_in("reddit", KEY) + 0.05)
+        before = state.requests
+        lookup(0)
+        waits.append(negative_cache.retry_in("reddit", KEY))
+        print(f"retry {attempt}: {state.requests - before} request, attempts={record()['attempts']}, "
+              f"next retry in {waits[-1]:.1f}s")
+    assert record()["attempts"] == 3
+
+    # Reviews show up: the next due retry finds them and drops the negative record
+    found = synthesize_fixture(n_submissions=3)
+    with state.lock:
+        fixture.update(found)
+    time.sleep(negative_cache.retry_in("reddit", KEY) + 0.05)
+    reviews = lookup(0)
+    print(f"after reviews appear: {reviews} reviews, negative record {'kept' if record() else 'cleared'}")
+    assert reviews > 0 and record() is None
+
+    server.shutdown()
+    print("\n✅ Empty scrapes back off across processes and recover once reviews exist.")
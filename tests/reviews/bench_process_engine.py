@@ -0,0 +1,70 @@
+"""
+Throughput of the NLP stage (analyze_reviews) for several laptops at once:
+a thread pool (the "thread" engine, GIL-bound) vs. the analysis process pool
+("process" engine) at 1, 2, 4, ... workers up to the core count.
+
+Reviews come from the locust mock corpus (analysis_with_cache.scrape_reddit_reviews_mock),
+scraped once up front so only analysis is timed. The embedding cache is disabled so
+repeated rounds do the same amount of work.
+
+Usage:
+    python tests/reviews/bench_process_engine.py [n_models]
+"""
+import asyncio
+import concurrent.futures
+import os
+import sys
+import time
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+sys.path[:0] = [TESTS_DIR, BACKEND_DIR]
+os.environ["EMBEDDING_CACHE_CAPACITY"] = "0"
+os.environ["SENTIMENT_CACHE_PATH"] = ""  # disabled
+
+from reviews import analysis_with_cache as mock  # noqa: E402
+from reviews import analysis  # noqa: E402
+
+MODEL_NAMES = [
+    "Lenovo IdeaPad Slim 5", "Lenovo Legion 5", "Lenovo Yoga Slim 7i", "HP Victus 15",
+    "Asus TUF A15", "Dell Inspiron 14", "Acer Swift Go 14", "MacBook Air M2",
+]
+
+
+def run_round(executor, corpora):
+    start = time.perf_counter()
+    futures = [executor.submit(analysis.analyze_reviews, name, raw) for name, raw in corpora]
+    for f in futures:
+        f.result()
+    return time.perf_counter() - start
+
+
+def worker_counts():
+    counts, n = [], 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+if __name__ == "__main__":
+    n_models = int(sys.argv[1]) if len(sys.argv) > 1 else len(MODEL_NAMES)
+    names = [MODEL_NAMES[i % len(MODEL_NAMES)] for i in range(n_models)]
+    corpora = [(name, {"reddit": asyncio.run(mock.scrape_reddit_reviews_mock(name))}) for name in names]
+    print(f"{n_models} models, {sum(len(r['reddit']) for _, r in corpora)} reviews, {os.cpu_count()} cores\n")
+
+    # Warm-up outside the timings (NLTK data, first KeyBERT call)
+    analysis.analyze_reviews(*corpora[0])
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(n_models, 5)) as executor:
+        baseline = run_round(executor, corpora)
+    print(f"{'engine':<18} {'time (s)':>9} {'speedup':>8}")
+    print(f"{'thread x5':<18} {baseline:>9.2f} {1.0:>7.1f}x")
+
+    for workers in worker_counts():
+        pool = analysis.make_analysis_pool(workers)
+        for f in [pool.submit(analysis.analyze_reviews, *corpora[0]) for _ in range(workers)]:
+            f.result()  # every worker has loaded its models and run KeyBERT once
+        elapsed = run_round(pool, corpora)
+        pool.shutdown()
+        print(f"{f'process x{workers}':<18} {elapsed:>9.2f} {baseline / elapsed:>7.1f}x")
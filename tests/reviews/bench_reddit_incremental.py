@@ -0,0 +1,116 @@
+"""
+Incremental Reddit refresh (reviews/reddit.py watermarks) against the local stub:
+
+1. cold scrape: search + one comment tree per submission
+2. refresh with nothing new: only the two searches (relevance + sort=new)
+3. a new thread (outside the relevance top 50) and new comments on an old one:
+   the searches plus exactly those two trees; nothing is duplicated or lost
+4. a comment tree that fails to load is fetched again on the next refresh
+5. an old id-less cache is migrated by one full pass without duplicating reviews
+
+Runs on a throwaway cache store (CACHE_STORE=sqlite in a temp dir).
+
+Usage:
+    python tests/reviews/bench_reddit_incremental.py
+"""
+import os
+import sys
+import tempfile
+from collections import Counter
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)), BACKEND_DIR]
+
+from reddit_stub_server import _comment, start_stub, synthesize_fixture  # noqa: E402
+
+fixture = synthesize_fixture()
+server, state, base_url = start_stub(fixture)
+
+# Must be set before the reviews modules read them
+tmp = tempfile.mkdtemp(prefix="reddit_incremental_")
+os.environ.update({
+    "REDDIT_API_BASE": base_url,
+    "REDDIT_AUTH_URL": f"{base_url}/api/v1/access_token",
+    "REDDIT_CLIENT_ID": os.getenv("REDDIT_CLIENT_ID") or "stub",
+    "REDDIT_CLIENT_SECRET": os.getenv("REDDIT_CLIENT_SECRET") or "stub",
+    "REDDIT_USER_AGENT": "bench",
+    "REDDIT_SCRAPER": "async",
+    "REDDIT_REFRESH_HOURS": "0",  # every call is due for a refresh
+    "CACHE_STORE": "sqlite",
+    "CACHE_DB_PATH": os.path.join(tmp, "cache.sqlite"),
+})
+
+from reviews.cache_store import NS_REDDIT_RAW, get_cache_store  # noqa: E402
+from reviews.model_names import model_cache_key  # noqa: E402
+from reviews.reddit import scrape_reddit_reviews  # noqa: E402
+
+MODEL = "Stub Laptop 15"  # not in the repo's file caches, so the first scrape is cold
+
+
+def scrape(model=MODEL):
+    before = state.requests
+    reviews = scrape_reddit_reviews(model)
+    return reviews, state.requests - before
+
+
+if __name__ == "__main__":
+    cold, cold_requests = scrape()
+    print(f"cold scrape:      {len(cold):>5} reviews, {cold_requests:>3} requests")
+
+    unchanged, requests = scrape()
+    print(f"nothing new:      {len(unchanged):>5} reviews, {requests:>3} requests")
+    assert unchanged == cold and requests == 2, "an unchanged refresh should only run the two searches"
+
+    # One new thread (newest, so only sort=new returns it within the limit) + two replies on s003
+    new_texts = ["Brand new thread about the Legion 5 hinge", "hinge cracked after a month", "mine is fine"]
+    with state.lock:
+        submissions = fixture["search"]["data"]["children"]
+        newest = max(s["data"]["created_utc"] for s in submissions)
+        thread = {"kind": "t3", "data": {
+            "id": "s999", "title": "Brand new thread", "selftext": "about the Legion 5 hinge",
+            "created_utc": newest + 60, "num_comments": 1,
+        }}
+        submissions.append(thread)
+        fixture["comments"]["s999"] = [
+            {"kind": "Listing", "data": {"children": [thread]}},
+            {"kind": "Listing", "data": {"children": [_comment(new_texts[1], "s999c0")]}},
+        ]
+        old = next(s for s in submissions if s["data"]["id"] == "s003")
+        old["data"]["num_comments"] += 1
+        fixture["comments"]["s003"][1]["data"]["children"].append(_comment(new_texts[2], "s003c99"))
+
+    refreshed, requests = scrape()
+    print(f"1 thread + 2 new: {len(refreshed):>5} reviews, {requests:>3} requests")
+    assert requests == 4, f"expected 2 searches + 2 comment trees, got {requests} requests"
+    assert Counter(refreshed) == Counter(cold) + Counter(new_texts), "merged reviews differ from cold + new"
+
+    # A comment tree that fails to load must be fetched again on the next refresh
+    with state.lock:
+        thread = {"kind": "t3", "data": {
+            "id": "s998", "title": "Flaky thread", "selftext": "about the Legion 5 fans",
+            "created_utc": newest + 120, "num_comments": 1,
+        }}
+        submissions.append(thread)
+        fixture["comments"]["s998"] = [
+            {"kind": "Listing", "data": {"children": [thread]}},
+            {"kind": "Listing", "data": {"children": [_comment("fans are loud under load", "s998c0")]}},
+        ]
+        state.fail_once.add("s998")
+    failed, requests = scrape()
+    recovered, requests_after = scrape()
+    print(f"failed tree:      {len(failed):>5} reviews, {requests:>3} requests; "
+          f"next refresh {len(recovered)} reviews, {requests_after} requests")
+    assert "fans are loud under load" not in failed and "fans are loud under load" in recovered
+    assert requests_after == 3, "only the failed tree should be fetched again"
+    refreshed = recovered
+
+    # Legacy cache: a flat list without ids is replaced by tracked threads in one pass
+    legacy_model = "Stub Laptop 16"
+    get_cache_store().put(NS_REDDIT_RAW, model_cache_key(legacy_model), cold)
+    migrated, requests = scrape(legacy_model)
+    print(f"legacy migration: {len(migrated):>5} reviews, {requests:>3} requests")
+    assert Counter(migrated) == Counter(refreshed), "legacy reviews were duplicated or lost"
+
+    server.shutdown()
+    print("\n✅ Incremental refresh fetched only the changed threads.")
@@ -0,0 +1,62 @@
+"""
+Async Reddit scraper against the local stub (reddit_stub_server.py):
+
+1. cold scrape of 50 submissions with per-request latency, sequential
+   (concurrency 1, i.e. what praw does) vs. concurrent; outputs must match
+2. the same scrape under a tight rate limit: the client must pace itself
+   from the X-Ratelimit headers and still return everything
+
+Usage:
+    python tests/reviews/bench_reddit_scraper.py [latency_ms] [concurrency]
+"""
+import asyncio
+import os
+import sys
+import time
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)), BACKEND_DIR]
+
+from reddit_stub_server import start_stub, synthesize_fixture  # noqa: E402
+from reviews.reddit_async import AsyncRedditClient, scrape_reddit_reviews_async  # noqa: E402
+
+
+def scrape(base_url, concurrency):
+    async def main():
+        client = AsyncRedditClient(
+            "stub", "stub", "bench", concurrency=concurrency,
+            api_base=base_url, auth_url=f"{base_url}/api/v1/access_token"
+        )
+        return await scrape_reddit_reviews_async("Lenovo Legion 5 review", limit=50, client=client), client
+
+    start = time.perf_counter()
+    reviews, client = asyncio.run(main())
+    return reviews, client, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 150
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    fixture = synthesize_fixture()
+
+    server, state, base_url = start_stub(fixture, latency_ms=latency_ms)
+    sequential, _, seq_sec = scrape(base_url, 1)
+    concurrent, _, con_sec = scrape(base_url, concurrency)
+    server.shutdown()
+
+    assert sequential == concurrent, "concurrent scrape returned different reviews"
+    print(f"{len(concurrent)} reviews from 50 submissions, {latency_ms:.0f}ms per request")
+    print(f"{'sequential':<14} {seq_sec:>7.2f}s")
+    print(f"{f'concurrency {concurrency}':<14} {con_sec:>7.2f}s  ({seq_sec / con_sec:.1f}x, "
+          f"max {state.max_in_flight} in flight)")
+
+    # 51 requests against 20 per 2s: needs ~5 windows, and must not be rejected
+    server, state, base_url = start_stub(fixture, latency_ms=10, quota=20, window=2)
+    limited, client, lim_sec = scrape(base_url, concurrency)
+    server.shutdown()
+
+    assert limited == concurrent, "rate-limited scrape returned different reviews"
+    print(f"\nrate limit 20/2s: {lim_sec:.2f}s, {state.requests} requests, {state.rejected} rejected (429), "
+          f"{client.limiter.waited_sec:.1f}s paced (summed over tasks)")
+    assert state.rejected == 0, "client ignored the rate-limit headers"
@@ -0,0 +1,89 @@
+"""
+Counts VADER polarity_scores calls for one model's analysis, before and
+after the shared SentimentCache, on the mock corpus used by the locust
+tests (analysis_with_cache.scrape_reddit_reviews_mock).
+
+KeyBERT is replaced by a no-op here so only the sentiment stages
+(platform stats, per-group labels, snippet scoring) are measured.
+
+Usage:
+    python tests/reviews/bench_sentiment_calls.py ["Lenovo IdeaPad Slim 5"]
+"""
+import asyncio
+import os
+import sys
+import time
+import numpy as np
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+sys.path[:0] = [TESTS_DIR, BACKEND_DIR]
+
+from reviews import analysis_with_cache as legacy  # noqa: E402
+from reviews import analysis as current  # noqa: E402
+from reviews.sentiment_cache import SentimentCache  # noqa: E402
+
+
+class CountingAnalyzer:
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.calls = 0
+
+    def polarity_scores(self, text):
+        self.calls += 1
+        return self.analyzer.polarity_scores(text)
+
+
+class ZeroEmbedder:
+    def embed(self, documents, verbose=False):
+        return np.zeros((len(documents), 384), dtype=np.float32)
+
+
+class NoKeywords:
+    """KeyBERT stand-in: zero embeddings (for the batched path) and no keywords."""
+
+    model = ZeroEmbedder()
+
+    def extract_embeddings(self, docs, **kwargs):
+        return np.zeros((len(docs), 384), dtype=np.float32), np.zeros((0, 384), dtype=np.float32)
+
+    def extract_keywords(self, docs, *args, **kwargs):
+        # KeyBERT returns one list per document for a list of several documents
+        if isinstance(docs, list) and len(docs) > 1:
+            return [[] for _ in docs]
+        return []
+
+
+def run_legacy(raw_data, all_reviews):
+    counter = CountingAnalyzer(legacy.sia)
+    legacy.sia = counter  # analyze_platform_stats_wrapper reads the module global
+    start = time.perf_counter()
+    legacy.analyze_platform_stats_wrapper(raw_data)
+    legacy.analyze_unified_groups(all_reviews, counter, NoKeywords(), legacy.user_keywords)
+    legacy.sia = counter.analyzer
+    return counter.calls, time.perf_counter() - start
+
+
+def run_current(raw_data, all_reviews):
+    counter = CountingAnalyzer(current.sia)
+    scorer = SentimentCache(counter)
+    start = time.perf_counter()
+    for reviews in raw_data.values():
+        current.analyze_sentiment_stats(reviews, scorer)
+    current.analyze_unified_groups(all_reviews, scorer, NoKeywords(), current.user_keywords)
+    return counter.calls, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    model_name = sys.argv[1] if len(sys.argv) > 1 else "Lenovo IdeaPad Slim 5"
+    reviews = asyncio.run(legacy.scrape_reddit_reviews_mock(model_name))
+    raw_data = {"reddit": reviews}
+
+    legacy_calls, legacy_sec = run_legacy(raw_data, reviews)
+    current_calls, current_sec = run_current(raw_data, reviews)
+
+    print(f"\nCorpus: {len(reviews)} reviews ({len(set(reviews))} unique)")
+    print(f"{'':<8} {'VADER calls':>12} {'time (ms)':>10}")
+    print(f"{'before':<8} {legacy_calls:>12} {legacy_sec * 1000:>10.1f}")
+    print(f"{'after':<8} {current_calls:>12} {current_sec * 1000:>10.1f}")
+    print(f"Reduction: {100 * (1 - current_calls / legacy_calls):.1f}%")
@@ -0,0 +1,79 @@
+"""
+Bounded YouTube comment ingestion (reviews/youtube.py take_comments) against a
+fake downloader: a popular video with 20,000 comments, served in pages of 20
+with per-page latency, the way YoutubeCommentDownloader pages lazily.
+
+Compares the old behaviour (iterate to exhaustion, then clean) with the capped
+stream, and shows each cap (count, bytes, deadline) stopping pagination.
+
+Usage:
+    python tests/reviews/bench_youtube_ingestion.py [page_latency_ms] [total_comments]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)), BACKEND_DIR]
+
+from synthetic_corpus import make_corpus  # noqa: E402
+from reviews.youtube import clean_text, take_comments  # noqa: E402
+
+PAGE_SIZE = 20
+
+
+class FakeVideo:
+    def __init__(self, total, page_latency):
+        self.texts = make_corpus(2000)
+        self.total = total
+        self.page_latency = page_latency
+        self.pages = 0
+
+    def comments(self):
+        for i in range(self.total):
+            if i % PAGE_SIZE == 0:
+                time.sleep(self.page_latency)  # one continuation request
+                self.pages += 1
+            yield {"cid": str(i), "text": self.texts[i % len(self.texts)], "votes": "0", "reply": False}
+
+
+def exhaust(comments):
+    """What fetch_video_data used to do: collect everything, then clean."""
+    texts = [c["text"] for c in comments if len(c["text"]) > 10]
+    return [clean_text(t) for t in texts if len(t.strip()) > 20], "exhausted"
+
+
+def measure(label, video, ingest):
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept, stop = ingest(video.comments())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {elapsed:>7.2f}s {video.pages:>6} pages {len(kept):>6} kept "
+          f"{peak / 1024 / 1024:>7.1f}MB peak  stop={stop}")
+    return kept, stop
+
+
+if __name__ == "__main__":
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 10) / 1000
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    print(f"{total} comments, {PAGE_SIZE} per page, {latency * 1000:.0f}ms per page\n")
+
+    full, _ = measure("exhaust (old)", FakeVideo(total, latency), exhaust)
+    capped, stop = measure("defaults", FakeVideo(total, latency), take_comments)
+    assert capped == full[:len(capped)], "streamed cleaning differs from clean-after-download"
+
+    _, stop = measure("count cap 50", FakeVideo(total, latency), lambda c: take_comments(c, max_comments=50))
+    assert stop == "count"
+    _, stop = measure("bytes cap 16KB", FakeVideo(total, latency),
+                      lambda c: take_comments(c, max_comments=10 ** 6, max_bytes=16 * 1024))
+    assert stop == "bytes"
+    video = FakeVideo(total, latency)
+    _, stop = measure("deadline 0.5s", video,
+                      lambda c: take_comments(c, max_comments=10 ** 6, max_bytes=10 ** 9, deadline_sec=0.5))
+    assert stop == "deadline" and video.pages < total / PAGE_SIZE
+
+    print("\n✅ Every cap stops pagination early; kept comments match the uncapped prefix.")
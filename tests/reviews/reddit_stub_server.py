@@ -0,0 +1,241 @@
+"""
+Local stand-in for the Reddit API endpoints used by reviews/reddit_async.py,
+replaying recorded responses with configurable latency and rate limiting.
+
+Fixture format: {"search": <search listing JSON>, "comments": {<id>: <comments JSON>}}
+(search honours sort=new by created_utc; the fixture can be edited between scrapes under state.lock)
+- `record` captures one from the real API (needs REDDIT_CLIENT_ID/SECRET)
+- without --fixture, one is synthesized from the cached raw reviews in
+  backend/reviews/json_files/reddit_raw_reviews (same shapes as the real API)
+
+Usage:
+    python tests/reviews/reddit_stub_server.py serve [--port 8765] [--latency-ms 150] [--quota 60 --window 10] [--fixture FILE]
+    python tests/reviews/reddit_stub_server.py record "Lenovo Legion 5 review" FILE
+then point the scraper at it:
+    REDDIT_API_BASE=http://127.0.0.1:8765 REDDIT_AUTH_URL=http://127.0.0.1:8765/api/v1/access_token
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+RAW_REVIEWS_DIR = os.path.join(BACKEND_DIR, "reviews", "json_files", "reddit_raw_reviews")
+
+
+def _comment(body, cid, replies=None):
+    return {"kind": "t1", "data": {
+        "id": cid, "body": body,
+        "replies": {"kind": "Listing", "data": {"children": replies}} if replies else "",
+    }}
+
+
+def count_comments(children):
+    """num_comments as Reddit reports it: every t1 in the tree (stubs excluded)."""
+    total = 0
+    for child in children:
+        if child.get("kind") == "t1":
+            total += 1
+            replies = child["data"].get("replies")
+            if isinstance(replies, dict):
+                total += count_comments(replies["data"]["children"])
+    return total
+
+
+def synthesize_fixture(n_submissions=50, seed=7, created_from=1_700_000_000):
+    """Search listing + comment trees (nested replies and "more" stubs) built from cached raw reviews."""
+    rng = random.Random(seed)
+    texts = []
+    for filename in sorted(os.listdir(RAW_REVIEWS_DIR)):
+        with open(os.path.join(RAW_REVIEWS_DIR, filename), encoding="utf-8") as f:
+            cached = json.load(f)
+        if isinstance(cached, list):  # raw-store files from before per-thread ids
+            texts.extend(t for t in cached if t.strip())
+        else:
+            for thread in cached.get("threads", []):
+                texts.extend(t for t in [thread["text"]] + [body for _, body in thread["comments"]] if t.strip())
+    if not texts:
+        texts = [f"Synthetic review number {i} about the laptop screen and battery." for i in range(500)]
+
+    submissions, comments = [], {}
+    for i in range(n_submissions):
+        sid = f"s{i:03d}"
+        submissions.append({"kind": "t3", "data": {
+            "id": sid, "title": f"Review thread {i}", "selftext": rng.choice(texts),
+            "created_utc": created_from + i * 3600,
+        }})
+        top_level = []
+        for j in range(rng.randint(0, 12)):
+            replies = [_comment(rng.choice(texts), f"{sid}c{j}r{k}") for k in range(rng.randint(0, 3))]
+            top_level.append(_comment(rng.choice(texts), f"{sid}c{j}", replies))
+        if rng.random() < 0.3:
+            top_level.append({"kind": "more", "data": {"count": 5, "children": ["x1", "x2"]}})
+        submissions[-1]["data"]["num_comments"] = count_comments(top_level)
+        comments[sid] = [
+            {"kind": "Listing", "data": {"children": [submissions[-1]]}},
+            {"kind": "Listing", "data": {"children": top_level}},
+        ]
+    return {"search": {"kind": "Listing", "data": {"children": submissions}}, "comments": comments}
+
+
+class StubState:
+    def __init__(self, fixture, latency_ms=0, quota=None, window=10.0):
+        self.fixture = fixture
+        self.latency = latency_ms / 1000
+        self.quota = quota
+        self.window = window
+        self.window_start = time.monotonic()
+        self.used = 0
+        self.requests = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_once = set()  # submission ids whose next comments request answers 500
+        self.lock = threading.Lock()
+
+    def admit(self):
+        """(allowed, rate-limit headers) for one API request."""
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            if now - self.window_start >= self.window:
+                self.window_start, self.used = now, 0
+            reset = math.ceil(max(self.window - (now - self.window_start), 0))
+            if self.quota is None:
+                return True, {}
+            if self.used >= self.quota:
+                self.rejected += 1
+                return False, {"Retry-After": str(reset), "x-ratelimit-remaining": "0",
+                               "x-ratelimit-reset": str(reset), "x-ratelimit-used": str(self.used)}
+            self.used += 1
+            return True, {"x-ratelimit-remaining": f"{self.quota - self.used}.0",
+                          "x-ratelimit-reset": str(reset), "x-ratelimit-used": str(self.used)}
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.startswith("/api/v1/access_token"):
+                return self._send(200, {"access_token": "stub-token", "token_type": "bearer", "expires_in": 3600})
+            self._send(404, {"error": 404})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            with state.lock:
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            try:
+                time.sleep(state.latency)
+                allowed, headers = state.admit()
+                if not allowed:
+                    return self._send(429, {"message": "Too Many Requests", "error": 429}, headers)
+
+                if url.path.endswith("/search"):
+                    query = parse_qs(url.query)
+                    limit = int(query.get("limit", ["25"])[0])
+                    with state.lock:  # the fixture may be edited while serving
+                        listing = json.loads(json.dumps(state.fixture["search"]))
+                    children = listing["data"]["children"]
+                    if query.get("sort", ["relevance"])[0] == "new":
+                        children.sort(key=lambda c: c["data"].get("created_utc", 0), reverse=True)
+                    listing["data"]["children"] = children[:limit]
+                    return self._send(200, listing, headers)
+                if url.path.startswith("/comments/"):
+                    sid = url.path.split("/")[2]
+                    with state.lock:
+                        failing = sid in state.fail_once
+                        state.fail_once.discard(sid)
+                    if failing:
+                        return self._send(500, {"error": 500}, headers)
+                    with state.lock:
+                        tree = state.fixture["comments"].get(sid)
+                        tree = json.loads(json.dumps(tree)) if tree is not None else None
+                    if tree is not None:
+                        return self._send(200, tree, headers)
+                self._send(404, {"error": 404}, headers)
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+    return Handler
+
+
+def start_stub(fixture=None, latency_ms=0, quota=None, window=10.0, port=0):
+    """Starts the stub on a daemon thread; returns (server, state, base_url)."""
+    state = StubState(fixture or synthesize_fixture(), latency_ms, quota, window)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def record_fixture(query, out_path, subreddit="laptops", limit=50):
+    sys.path.insert(0, BACKEND_DIR)
+    from reviews.reddit_async import AsyncRedditClient
+
+    client = AsyncRedditClient(os.getenv("REDDIT_CLIENT_ID"), os.getenv("REDDIT_CLIENT_SECRET"), os.getenv("REDDIT_USER_AGENT"))
+    try:
+        search = await client.get(f"/r/{subreddit}/search", {"q": query, "restrict_sr": 1, "limit": limit, "type": "link"})
+        ids = [c["data"]["id"] for c in search["data"]["children"] if c.get("kind") == "t3"]
+        trees = await asyncio.gather(*(client.get(f"/comments/{sid}", {"limit": 500}) for sid in ids))
+    finally:
+        await client.http.aclose()
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"search": search, "comments": dict(zip(ids, trees))}, f)
+    print(f"💾 Recorded {len(ids)} submissions to {out_path}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency-ms", type=float, default=150)
+    serve.add_argument("--quota", type=int, default=None, help="requests per window (omit for no limit)")
+    serve.add_argument("--window", type=float, default=10)
+    serve.add_argument("--fixture")
+    record = sub.add_parser("record")
+    record.add_argument("query")
+    record.add_argument("out")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(record_fixture(args.query, args.out))
+    else:
+        fixture = None
+        if args.fixture:
+            with open(args.fixture, encoding="utf-8") as f:
+                fixture = json.load(f)
+        server, state, base_url = start_stub(fixture, args.latency_ms, args.quota, args.window, args.port)
+        print(f"Reddit stub on {base_url} (latency {args.latency_ms}ms, quota {args.quota}/{args.window}s)")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"requests={state.requests} rejected={state.rejected} max_in_flight={state.max_in_flight}")
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,98 @@
+"""
+Replays historical model-name requests and reports the review-cache hit rate
+with the old keys (model_name.replace(' ', '_')) vs. canonical keys
+(reviews.model_names.model_cache_key).
+
+A request is a hit when an earlier request produced the same key, i.e. its
+scrape + NLP run would have been served from cache.
+
+Sources:
+    --mongo   model names in the bot results stored in the `requests` collection (needs MONGO_URI)
+    default   the cache files already under backend/reviews/json_files/ (one per name ever analyzed)
+
+Usage:
+    python tests/reviews/report_model_name_hit_rate.py [--mongo] [--show-groups]
+"""
+import ast
+import os
+import sys
+from collections import defaultdict
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "backend"))
+sys.path.insert(0, BACKEND_DIR)
+
+from reviews.model_names import model_cache_key  # noqa: E402
+
+JSON_FILES_DIR = os.path.join(BACKEND_DIR, "reviews", "json_files")
+
+
+def collect_models(value, out):
+    """Every "model" string anywhere in a (possibly nested) bot result."""
+    if isinstance(value, dict):
+        if isinstance(value.get("model"), str):
+            out.append(value["model"])
+        for v in value.values():
+            collect_models(v, out)
+    elif isinstance(value, list):
+        for v in value:
+            collect_models(v, out)
+    return out
+
+
+def names_from_mongo():
+    from db_mongo import requests_collection
+
+    names = []
+    for doc in requests_collection.find({"bot_result": {"$ne": None}}, {"bot_result": 1}).sort("timestamp", 1):
+        result = doc["bot_result"]
+        if isinstance(result, str):  # stored as str(resp_json)
+            try:
+                result = ast.literal_eval(result)
+            except (ValueError, SyntaxError):
+                continue
+        collect_models(result, names)
+    return names
+
+
+def names_from_cache_files():
+    names = []
+    for folder in sorted(os.listdir(JSON_FILES_DIR)):
+        path = os.path.join(JSON_FILES_DIR, folder)
+        if not os.path.isdir(path):
+            continue
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith(".json"):
+                stem = filename[:-len(".json")]
+                names.append(stem.removesuffix("_unified").replace("_", " "))
+    return names
+
+
+def replay(names, key_fn):
+    seen, hits = set(), 0
+    for name in names:
+        key = key_fn(name)
+        hits += key in seen
+        seen.add(key)
+    return hits, len(seen)
+
+
+if __name__ == "__main__":
+    names = names_from_mongo() if "--mongo" in sys.argv else names_from_cache_files()
+    if not names:
+        sys.exit("No model names found.")
+
+    print(f"{len(names)} requests, {len(set(names))} distinct spellings\n")
+    print(f"{'keys':<10} {'distinct':>9} {'hits':>6} {'hit rate':>9}")
+    for label, key_fn in (("raw", lambda n: n.replace(" ", "_")), ("canonical", model_cache_key)):
+        hits, distinct = replay(names, key_fn)
+        print(f"{label:<10} {distinct:>9} {hits:>6} {hits / len(names):>8.1%}")
+
+    if "--show-groups" in sys.argv:
+        groups = defaultdict(set)
+        for name in names:
+            groups[model_cache_key(name)].add(name)
+        print()
+        for key, spellings in sorted(groups.items()):
+            if len(spellings) > 1:
+                print(f"{key}: {sorted(spellings)}")
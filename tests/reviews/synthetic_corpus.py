@@ -0,0 +1,98 @@
+"""
+Deterministic synthetic Reddit-style review corpora for benchmarking
+reviews/analysis.py. The same (size, seed) always gives the same corpus.
+
+Shape, roughly modelled on the scraped caches in backend/reviews/json_files:
+- review length is log-normal in sentences (median ~3, long tail to ~40)
+- ~8% are too short to analyze (< 20 chars) and ~5% repeat an earlier review
+- ~60% mention at least one user-group activity, some several
+- sentences mix positive / negative / neutral aspect opinions, some with URLs
+"""
+import hashlib
+import json
+import random
+
+ASPECTS = [
+    "screen", "display", "battery", "battery life", "keyboard", "trackpad", "fans", "thermals",
+    "build quality", "hinge", "speakers", "webcam", "wifi card", "ssd", "ram", "cpu", "gpu",
+    "charger", "ports", "refresh rate", "brightness", "weight", "chassis", "touchpad", "bios",
+]
+POSITIVE = [
+    "the {a} is amazing", "really love the {a}", "{a} is excellent for the price",
+    "the {a} feels premium and solid", "honestly the {a} exceeded my expectations",
+    "{a} is fast and reliable", "very happy with the {a}", "the {a} is great, no complaints",
+]
+NEGATIVE = [
+    "the {a} is terrible", "{a} broke after a few months", "really disappointed by the {a}",
+    "the {a} is flaky and keeps failing", "{a} gets way too hot and loud", "the {a} is garbage honestly",
+    "had constant issues with the {a}", "the {a} is dim and sluggish",
+]
+NEUTRAL = [
+    "the {a} is fine I guess", "{a} is about what you'd expect", "not sure about the {a} yet",
+    "the {a} is average", "{a} is okay for now",
+]
+ACTIVITIES = [
+    "gaming at high fps", "playing valorant", "streaming on twitch", "ray tracing in new games",
+    "college lectures on zoom", "writing my assignment", "taking notes in class", "exam prep and research",
+    "video editing in premiere", "color grading 4k footage", "photoshop and creative cloud", "rendering animation",
+    "netflix and browsing", "watching movies", "social media and email", "spotify and podcasts",
+    "coding in python", "docker and linux", "compile times for java", "machine learning scripts", "debug sessions with git",
+]
+OPENERS = [
+    "I bought this {m} last month.", "Had the {m} for a year now.", "Update on my {m}:",
+    "Coming from an older laptop,", "My two cents on the {m}.", "",
+]
+FILLERS = ["lol", "idk", "+1", "same here", "thanks!", "this.", "nope"]
+
+
+def _sentence(rng, model_name):
+    roll = rng.random()
+    if roll < 0.42:
+        text = rng.choice(POSITIVE)
+    elif roll < 0.78:
+        text = rng.choice(NEGATIVE)
+    else:
+        text = rng.choice(NEUTRAL)
+    text = text.format(a=rng.choice(ASPECTS))
+    if rng.random() < 0.35:
+        text += f" for {rng.choice(ACTIVITIES)}"
+    if rng.random() < 0.03:
+        text += " https://example.com/thread/" + str(rng.randint(1000, 9999))
+    return text[0].upper() + text[1:] + rng.choice([".", ".", ".", "!", "?"])
+
+
+def make_review(rng, model_name):
+    if rng.random() < 0.08:
+        return rng.choice(FILLERS)
+    n_sentences = max(1, min(40, round(rng.lognormvariate(1.1, 0.7))))
+    parts = [rng.choice(OPENERS).format(m=model_name)]
+    parts.extend(_sentence(rng, model_name) for _ in range(n_sentences))
+    return " ".join(p for p in parts if p)
+
+
+def make_corpus(size, seed=1234, model_name="Lenovo IdeaPad Slim 5"):
+    rng = random.Random(f"{seed}:{size}")
+    reviews = []
+    for _ in range(size):
+        if reviews and rng.random() < 0.05:
+            reviews.append(rng.choice(reviews))
+        else:
+            reviews.append(make_review(rng, model_name))
+    return reviews
+
+
+def corpus_checksum(reviews):
+    return hashlib.sha1(json.dumps(reviews).encode("utf-8")).hexdigest()[:12]
+
+
+if __name__ == "__main__":
+    import statistics
+    import sys
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    corpus = make_corpus(size)
+    lengths = [len(r) for r in corpus]
+    print(f"{size} reviews, checksum {corpus_checksum(corpus)}")
+    print(f"chars: median {statistics.median(lengths)}, p90 {sorted(lengths)[int(0.9 * len(lengths))]}, max {max(lengths)}")
+    for review in corpus[:5]:
+        print("-", review)